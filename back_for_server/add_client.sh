@@ -2,37 +2,50 @@
 
 set -e
 
-CLIENT_NAME="$1"
+# Имена клиентов: один или несколько за один запуск
+if [[ $# -eq 0 ]]; then
+  echo "Не переданы имена клиентов." >&2
+  exit 1
+fi
 
 # Папка, куда сохраняется итоговый .ovpn
-OUTPUT_DIR="/etc/openvpn/clients"
+OUTPUT_DIR="${OUTPUT_DIR:-/etc/openvpn/clients}"
 /usr/bin/mkdir -p "$OUTPUT_DIR"
 
+# Блокировка PKI: easyrsa не допускает параллельных запусков
+LOCK_FILE="${PKI_LOCK_FILE:-/var/lock/easyrsa.lock}"
+exec 9>"$LOCK_FILE"
+/usr/bin/flock 9
+
 # Перейти в Easy-RSA
 cd /etc/openvpn/server/easy-rsa/ || exit 1
 
-# Построить клиентский сертификат без пароля
-./easyrsa --batch build-client-full "$CLIENT_NAME" nopass
-
-# Путь к итоговому .ovpn
-CONFIG_PATH="$OUTPUT_DIR/${CLIENT_NAME}.ovpn"
-
-# Сгенерировать .ovpn файл
-{
-  cat /etc/openvpn/server/client-common.txt
-  echo "<ca>"
-  cat pki/ca.crt
-  echo "</ca>"
-  echo "<cert>"
-  sed -ne '/BEGIN CERTIFICATE/,$ p' "pki/issued/${CLIENT_NAME}.crt"
-  echo "</cert>"
-  echo "<key>"
-  cat "pki/private/${CLIENT_NAME}.key"
-  echo "</key>"
-  echo "<tls-crypt>"
-  sed -ne '/BEGIN OpenVPN Static key/,$ p' /etc/openvpn/server/tc.key
-  echo "</tls-crypt>"
-} > "$CONFIG_PATH"
-
-# Вернуть путь к файлу для Flask
-echo "$CONFIG_PATH"
\ No newline at end of file
+for CLIENT_NAME in "$@"; do
+  # Построить клиентский сертификат без пароля
+  ./easyrsa --batch build-client-full "$CLIENT_NAME" nopass
+
+  # Путь к итоговому .ovpn
+  CONFIG_PATH="$OUTPUT_DIR/${CLIENT_NAME}.ovpn"
+
+  # Сгенерировать .ovpn файл во временный и переместить целиком:
+  # пул и клиенты не должны видеть недописанный конфиг
+  {
+    cat /etc/openvpn/server/client-common.txt
+    echo "<ca>"
+    cat pki/ca.crt
+    echo "</ca>"
+    echo "<cert>"
+    sed -ne '/BEGIN CERTIFICATE/,$ p' "pki/issued/${CLIENT_NAME}.crt"
+    echo "</cert>"
+    echo "<key>"
+    cat "pki/private/${CLIENT_NAME}.key"
+    echo "</key>"
+    echo "<tls-crypt>"
+    sed -ne '/BEGIN OpenVPN Static key/,$ p' /etc/openvpn/server/tc.key
+    echo "</tls-crypt>"
+  } > "${CONFIG_PATH}.tmp"
+  /usr/bin/mv -f "${CONFIG_PATH}.tmp" "$CONFIG_PATH"
+
+  # Вернуть путь к файлу для Flask, по строке на клиента
+  echo "$CONFIG_PATH"
+done
@@ -1,97 +1,427 @@
-from flask import Flask, request, jsonify, abort
-import subprocess
+import asyncio
 import os
+import re
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
 from dotenv import load_dotenv
+from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
 
 load_dotenv()
 
+import cert_pool  # noqa: E402
+
 API_KEY = os.getenv("API_KEY", "CHANGEME")
 CERT_OUTPUT_DIR = os.getenv("CERT_OUTPUT_DIR", "/etc/openvpn/clients/")
 SCRIPT_ADD = os.getenv("SCRIPT_ADD", "./add_client.sh")
 SCRIPT_REVOKE = os.getenv("SCRIPT_REVOKE", "./revoke_client.sh")
 PUBLIC_DOWNLOAD_URL = os.getenv("PUBLIC_DOWNLOAD_URL", "https://vpn.example.com/downloads")
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "16"))
+REVOKE_BATCH_MAX_SIZE = int(os.getenv("REVOKE_BATCH_MAX_SIZE", "500"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_WAIT_TIMEOUT = float(os.getenv("JOB_WAIT_TIMEOUT", "30"))
+JOB_KEEP = int(os.getenv("JOB_KEEP", "1000"))
+# Имена попадают в пути файлов, допускаются только безопасные символы
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
 
-app = Flask(__name__)
 
+class Failure(Exception):
+    """Ошибка задачи с телом ответа для клиента."""
 
-def check_auth():
-    key = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
-    if key != API_KEY:
-        abort(401, description="Unauthorized")
+    def __init__(self, content: dict):
+        super().__init__(content.get("message"))
+        self.content = content
 
 
-@app.route("/certificates", methods=["POST"])
-def create_cert():
-    check_auth()
+@dataclass
+class Job:
+    """Задача выпуска или отзыва сертификатов."""
 
-    json_data = request.get_json()
-    name = json_data.get("name")
-    if not name:
-        return jsonify({
-            "success": False,
-            "message": "Поле 'name' обязательно"
-        }), 400
+    kind: str
+    names: list[str]
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: dict | None = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
 
-    result = subprocess.run(
-        ["/bin/bash", SCRIPT_ADD, name],
-        capture_output=True, text=True
-    )
+    def as_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "names": self.names,
+            "status": self.status,
+            "queued_for": (self.started_at or time.time()) - self.created_at,
+            "duration": (self.finished_at - self.started_at
+                         if self.finished_at and self.started_at else None),
+            "result": self.result,
+        }
 
-    if result.returncode != 0:
-        return jsonify({
-            "success": False,
-            "message": "Ошибка при создании сертификата",
-            "details": result.stderr.strip(),
-            "log": result.stdout.strip()
-        }), 500
 
-    lines = result.stdout.strip().splitlines()
-    ovpn_path = lines[-1].strip() if lines else ""
+class JobQueue:
+    """Очередь операций с PKI.
+
+    Скрипты выполняются ограниченным числом воркеров, а сами
+    вызовы easyrsa - строго по одному под PKI блокировкой:
+    параллельные запуски портят index.txt. Задачи хранятся
+    для запроса статуса, старые удаляются.
+    """
+
+    def __init__(self, workers: int, size: int, keep: int):
+        self.workers = workers
+        self.size = size
+        self.keep = keep
+        self.jobs: dict[str, Job] = {}
+        self.pki_lock = asyncio.Lock()
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_duration = 0.0
+        self._queue: asyncio.Queue[Job] | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def submit(self, kind: str, names: list[str]) -> Job:
+        job = Job(kind=kind, names=names)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Очередь выпуска заполнена")
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.keep:
+            oldest = next(iter(self.jobs))
+            if not self.jobs[oldest].done.is_set():
+                break
+            del self.jobs[oldest]
+        return job
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            self.running += 1
+            try:
+                job.result = await JOB_HANDLERS[job.kind](job.names)
+                job.status = "done"
+                self.completed += 1
+            except Failure as error:
+                job.result = error.content
+                job.status = "failed"
+                self.failed += 1
+            except Exception as error:
+                job.result = {"success": False, "message": str(error)}
+                job.status = "failed"
+                self.failed += 1
+            finally:
+                job.finished_at = time.time()
+                self.total_duration += job.finished_at - job.started_at
+                self.running -= 1
+                job.done.set()
+                self._queue.task_done()
+
+    def metrics(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "queue_depth": self.depth,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_duration": self.total_duration / finished if finished else 0.0,
+            "pool_size": len(cert_pool.pool_files()),
+        }
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.size)
+        self._tasks = [asyncio.create_task(self._worker())
+                       for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+job_queue = JobQueue(workers=JOB_WORKERS, size=JOB_QUEUE_SIZE, keep=JOB_KEEP)
 
-    if not os.path.exists(ovpn_path):
-        return jsonify({
-            "success": False,
-            "message": "Сертификат не был создан",
-            "expected_path": ovpn_path,
-            "log": result.stdout.strip()
-        }), 500
 
-    public_url = f"{PUBLIC_DOWNLOAD_URL}/{name}.ovpn"
-    return jsonify({
+async def run_script(*args: str) -> tuple[int, str, str]:
+    """Запуск shell скрипта под PKI блокировкой без блокировки цикла."""
+    async with job_queue.pki_lock:
+        process = await asyncio.create_subprocess_exec(
+            "/bin/bash", *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await process.communicate()
+    return process.returncode, stdout.decode(), stderr.decode()
+
+
+async def issue_certs(names: list[str]) -> dict:
+    """Выдача сертификатов из пула, недостающие выпускаются
+    одним запуском скрипта под блокировкой PKI."""
+    ovpn_paths = {}
+    pending = []
+    claimed = []
+    try:
+        for name in names:
+            try:
+                ovpn_path = cert_pool.claim(name, CERT_OUTPUT_DIR)
+            except FileExistsError:
+                raise Failure({
+                    "success": False,
+                    "message": f"Сертификат '{name}' уже существует"
+                })
+            if ovpn_path:
+                claimed.append(name)
+                ovpn_paths[f"{name}.ovpn"] = ovpn_path
+            else:
+                pending.append(name)
+        if pending:
+            returncode, stdout, stderr = await run_script(SCRIPT_ADD, *pending)
+            if returncode != 0:
+                raise Failure({
+                    "success": False,
+                    "message": "Ошибка при создании сертификата",
+                    "details": stderr.strip(),
+                    "log": stdout.strip()
+                })
+            ovpn_paths.update({
+                os.path.basename(line.strip()): line.strip()
+                for line in stdout.splitlines()
+                if line.strip().endswith(".ovpn")
+            })
+
+        certificates = []
+        for name in names:
+            ovpn_path = ovpn_paths.get(f"{name}.ovpn", "")
+            if not os.path.exists(ovpn_path):
+                raise Failure({
+                    "success": False,
+                    "message": "Сертификат не был создан",
+                    "expected_path": ovpn_path
+                })
+            certificates.append({
+                "name": name,
+                "download_url": f"{PUBLIC_DOWNLOAD_URL}/{name}.ovpn"
+            })
+    except Exception:
+        # Запрос не выполнен: конфиги из пула возвращаются,
+        # иначе имена заняты, а готовые сертификаты потеряны
+        for name in claimed:
+            cert_pool.unclaim(name, CERT_OUTPUT_DIR)
+        raise
+    return {
         "success": True,
-        "message": "Сертификат успешно создан",
-        "download_url": public_url
-    }), 201
+        "message": "Сертификаты успешно созданы",
+        "certificates": certificates
+    }
 
 
-@app.route("/certificates/<string:name>", methods=["DELETE"])
-def revoke_cert(name: str):
-    check_auth()
+async def revoke_certs(names: list[str]) -> dict:
+    """Отзыв сертификатов одним запуском скрипта, CRL
+    пересобирается один раз. Результат по каждому имени,
+    скрипт печатает его только после установки CRL."""
+    common_names = {cert_pool.resolve(name): name for name in names}
+    _, stdout, stderr = await run_script(SCRIPT_REVOKE, *common_names)
+    statuses = {}
+    for line in stdout.splitlines():
+        status, _, rest = line.strip().partition(" ")
+        common_name = rest.split(" ", 1)[0]
+        if status in ("OK", "MISSING", "FAIL") and common_name in common_names:
+            statuses[common_names[common_name]] = status
 
-    if not name:
-        return jsonify({
-            "success": False,
-            "message": "Поле 'name' обязательно"
-        }), 400
+    results = []
+    for name in names:
+        status = statuses.get(name, "FAIL")
+        if status != "FAIL":
+            # Конфиг из пула лежит под именем клиента, а не CN
+            try:
+                os.remove(os.path.join(CERT_OUTPUT_DIR, f"{name}.ovpn"))
+            except FileNotFoundError:
+                pass
+            cert_pool.forget(name)
+        results.append({"name": name, "status": status.lower()})
+    return {
+        "success": all(result["status"] == "ok" for result in results),
+        "results": results,
+        "details": stderr.strip()
+    }
 
-    result = subprocess.run(
-        ["/bin/bash", SCRIPT_REVOKE, name],
-        capture_output=True, text=True
-    )
 
-    if result.returncode != 0:
-        return jsonify({
+async def revoke_cert(names: list[str]) -> dict:
+    """Отзыв одного сертификата, любой сбой - ошибка задачи."""
+    result = await revoke_certs(names)
+    if not result["success"]:
+        raise Failure({
             "success": False,
             "message": "Ошибка при отзыве сертификата",
-            "details": result.stderr.strip()
-        }), 500
+            "details": result["details"]
+        })
+    return {
+        "success": True,
+        "message": f"Сертификат '{names[0]}' отозван"
+    }
+
+
+JOB_HANDLERS = {
+    "issue": issue_certs,
+    "revoke": revoke_cert,
+    "revoke_batch": revoke_certs,
+}
+
+
+async def run_job(kind: str, names: list[str], status_code: int, render=None):
+    """Постановка задачи и ожидание результата.
+
+    Если задача не завершилась за JOB_WAIT_TIMEOUT, возвращается 202
+    с job_id, статус доступен в /jobs/{job_id}.
+    """
+    job = job_queue.submit(kind, names)
+    try:
+        await asyncio.wait_for(job.done.wait(), timeout=JOB_WAIT_TIMEOUT)
+    except asyncio.TimeoutError:
+        return JSONResponse(job.as_dict(), status_code=202)
+    if job.status == "failed":
+        return JSONResponse(job.result, status_code=500)
+    return JSONResponse(render(job.result) if render else job.result,
+                        status_code=status_code)
+
+
+def invalid_names(names: list[str]) -> JSONResponse | None:
+    """Ответ 400, если хотя бы одно имя не подходит под NAME_PATTERN."""
+    bad = [name for name in names if not NAME_PATTERN.fullmatch(name)]
+    if not bad:
+        return None
+    return JSONResponse({
+        "success": False,
+        "message": ("Имя должно состоять из латиницы, цифр, '_' и '-', "
+                    "не длиннее 64 символов"),
+        "names": bad
+    }, status_code=400)
+
+
+def check_auth(authorization: str = Header(default="")):
+    key = authorization.removeprefix("Bearer ").strip()
+    if key != API_KEY:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_queue.start()
+    cert_pool.start_refill(SCRIPT_ADD)
+    yield
+    await job_queue.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+class CertRequest(BaseModel):
+    name: str | None = None
+
+
+class BatchRequest(BaseModel):
+    names: list[str] | None = None
 
-    return jsonify({
+
+@app.post("/certificates", dependencies=[Depends(check_auth)])
+async def create_cert(data: CertRequest):
+    if not data.name:
+        return JSONResponse({
+            "success": False,
+            "message": "Поле 'name' обязательно"
+        }, status_code=400)
+    if error := invalid_names([data.name]):
+        return error
+
+    return await run_job("issue", [data.name], 201, lambda result: {
         "success": True,
-        "message": f"Сертификат '{name}' отозван"
+        "message": "Сертификат успешно создан",
+        "download_url": result["certificates"][0]["download_url"]
     })
 
 
-@app.route("/health", methods=["GET"])
-def health():
-    return jsonify({"status": "ok"})
+@app.post("/certificates/batch", dependencies=[Depends(check_auth)])
+async def create_certs_batch(data: BatchRequest):
+    names = data.names
+    if not names or not all(names):
+        return JSONResponse({
+            "success": False,
+            "message": "Поле 'names' должно быть непустым списком имен"
+        }, status_code=400)
+    if len(names) > BATCH_MAX_SIZE or len(set(names)) != len(names):
+        return JSONResponse({
+            "success": False,
+            "message": f"Допустимо до {BATCH_MAX_SIZE} уникальных имен"
+        }, status_code=400)
+    if error := invalid_names(names):
+        return error
+
+    return await run_job("issue", names, 201)
+
+
+@app.post("/certificates/revoke", dependencies=[Depends(check_auth)])
+async def revoke_certs_batch(data: BatchRequest):
+    names = data.names
+    if not names or not all(names):
+        return JSONResponse({
+            "success": False,
+            "message": "Поле 'names' должно быть непустым списком имен"
+        }, status_code=400)
+    if len(names) > REVOKE_BATCH_MAX_SIZE or len(set(names)) != len(names):
+        return JSONResponse({
+            "success": False,
+            "message": f"Допустимо до {REVOKE_BATCH_MAX_SIZE} уникальных имен"
+        }, status_code=400)
+    if error := invalid_names(names):
+        return error
+
+    return await run_job("revoke_batch", names, 200)
+
+
+@app.delete("/certificates/{name}", dependencies=[Depends(check_auth)])
+async def delete_cert(name: str):
+    if error := invalid_names([name]):
+        return error
+    return await run_job("revoke", [name], 200)
+
+
+@app.get("/jobs/{job_id}", dependencies=[Depends(check_auth)])
+async def job_status(job_id: str):
+    job = job_queue.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    return job.as_dict()
+
+
+@app.get("/metrics", dependencies=[Depends(check_auth)])
+async def metrics():
+    return job_queue.metrics()
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Один процесс: очередь и PKI блокировка живут в его памяти
+    uvicorn.run("cert_api:app",
+                host=os.getenv("HOST", "127.0.0.1"),
+                port=int(os.getenv("PORT", "5000")),
+                workers=1)
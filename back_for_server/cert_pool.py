@@ -0,0 +1,147 @@
+import fcntl
+import os
+import subprocess
+import threading
+import time
+import uuid
+
+POOL_DIR = os.getenv("POOL_DIR", "/etc/openvpn/pool")
+POOL_SIZE = int(os.getenv("POOL_SIZE", "8"))
+POOL_REFILL_BATCH = int(os.getenv("POOL_REFILL_BATCH", "2"))
+POOL_REFILL_INTERVAL = float(os.getenv("POOL_REFILL_INTERVAL", "10"))
+POOL_IDLE_LOAD = float(os.getenv("POOL_IDLE_LOAD", "0.5"))
+POOL_IDLE_SECONDS = float(os.getenv("POOL_IDLE_SECONDS", "30"))
+POOL_PREFIX = "pool-"
+ALIAS_DIR = os.path.join(POOL_DIR, "aliases")
+REFILL_LOCK = os.path.join(POOL_DIR, ".refill.lock")
+
+# Пул заранее выпущенных клиентских конфигов.
+# Выдача сначала переименовывает готовый файл внутри пула (os.rename
+# атомарен, поэтому воркеры не выдадут один конфиг дважды), затем
+# ссылается на него из каталога клиентов через os.link, который
+# не перезаписывает существующий конфиг. CN сертификата остается
+# pool-..., соответствие имени и CN хранится в aliases для отзыва.
+# POOL_DIR должен быть на той же файловой системе, что и каталог
+# клиентов. add_client.sh пишет конфиг во временный файл, в пуле
+# видны только дописанные .ovpn.
+
+_last_issue = 0.0
+
+
+def pool_files() -> list[str]:
+    try:
+        return sorted(
+            file for file in os.listdir(POOL_DIR)
+            if file.startswith(POOL_PREFIX) and file.endswith(".ovpn"))
+    except FileNotFoundError:
+        return []
+
+
+def claim(name: str, output_dir: str) -> str | None:
+    """Забрать готовый конфиг из пула под имя клиента.
+
+    FileExistsError - имя уже выдано: конфиг или alias существует,
+    иначе старый сертификат pool-... нельзя было бы отозвать.
+    """
+    global _last_issue
+    _last_issue = time.monotonic()
+    target = os.path.join(output_dir, f"{name}.ovpn")
+    alias_path = os.path.join(ALIAS_DIR, name)
+    if os.path.exists(target) or os.path.exists(alias_path):
+        raise FileExistsError(target)
+    for file in pool_files():
+        source = os.path.join(POOL_DIR, file)
+        claimed = f"{source}.claimed"
+        try:
+            os.rename(source, claimed)
+        except FileNotFoundError:
+            continue
+        try:
+            os.makedirs(ALIAS_DIR, exist_ok=True)
+            with open(alias_path, "x") as alias:
+                alias.write(file.removesuffix(".ovpn"))
+            try:
+                os.link(claimed, target)
+            except OSError:
+                os.remove(alias_path)
+                raise
+        except OSError:
+            # Конфиг возвращается в пул
+            os.rename(claimed, source)
+            raise
+        os.remove(claimed)
+        return target
+    return None
+
+
+def unclaim(name: str, output_dir: str) -> None:
+    """Вернуть в пул конфиг, выданный claim, при сбое выдачи."""
+    common_name = resolve(name)
+    if common_name == name:
+        return
+    os.rename(os.path.join(output_dir, f"{name}.ovpn"),
+              os.path.join(POOL_DIR, f"{common_name}.ovpn"))
+    forget(name)
+
+
+def resolve(name: str) -> str:
+    """CN сертификата для имени клиента."""
+    try:
+        with open(os.path.join(ALIAS_DIR, name)) as alias:
+            return alias.read().strip()
+    except FileNotFoundError:
+        return name
+
+
+def forget(name: str) -> None:
+    try:
+        os.remove(os.path.join(ALIAS_DIR, name))
+    except FileNotFoundError:
+        pass
+
+
+def is_idle() -> bool:
+    """Нода простаивает: нет выдачи и низкая нагрузка CPU."""
+    if time.monotonic() - _last_issue < POOL_IDLE_SECONDS:
+        return False
+    return os.getloadavg()[0] < POOL_IDLE_LOAD * (os.cpu_count() or 1)
+
+
+def refill(script: str) -> int:
+    """Выпуск недостающих конфигов, пополняет один процесс за раз."""
+    os.makedirs(POOL_DIR, exist_ok=True)
+    with open(REFILL_LOCK, "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return 0
+        missing = min(POOL_SIZE - len(pool_files()), POOL_REFILL_BATCH)
+        if missing <= 0:
+            return 0
+        names = [f"{POOL_PREFIX}{uuid.uuid4().hex}" for _ in range(missing)]
+        result = subprocess.run(
+            ["/bin/bash", script, *names],
+            capture_output=True, text=True,
+            env={**os.environ, "OUTPUT_DIR": POOL_DIR},
+        )
+        if result.returncode != 0:
+            return 0
+        return missing
+
+
+def _refill_loop(script: str) -> None:
+    while True:
+        time.sleep(POOL_REFILL_INTERVAL)
+        try:
+            if len(pool_files()) < POOL_SIZE and is_idle():
+                refill(script)
+        except OSError:
+            pass
+
+
+def start_refill(script: str) -> None:
+    """Фоновое пополнение пула в потоке процесса API."""
+    if POOL_SIZE <= 0:
+        return
+    threading.Thread(
+        target=_refill_loop, args=(script,), daemon=True).start()
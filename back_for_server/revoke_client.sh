@@ -2,33 +2,64 @@
 
 set -e
 
-CLIENT_NAME="$1"
+# Имена клиентов: один или несколько за один запуск
+if [[ $# -eq 0 ]]; then
+  echo "Не переданы имена клиентов." >&2
+  exit 1
+fi
+
 EASYRSA_DIR="/etc/openvpn/server/easy-rsa"
 CRL_PATH="/etc/openvpn/server/crl.pem"
 OUTPUT_DIR="/etc/openvpn/clients"
 
+# Блокировка PKI: easyrsa не допускает параллельных запусков
+LOCK_FILE="${PKI_LOCK_FILE:-/var/lock/easyrsa.lock}"
+exec 9>"$LOCK_FILE"
+/usr/bin/flock 9
+
 cd "$EASYRSA_DIR" || exit 1
 
-# Проверка: существует ли сертификат
-if [[ ! -f "pki/issued/${CLIENT_NAME}.crt" ]]; then
-  echo "Сертификат ${CLIENT_NAME} не найден." >&2
-  exit 1
-fi
+# Результат по каждому имени: "OK <имя>", "MISSING <имя>"
+# (сертификата нет, например уже отозван) или "FAIL <имя> <причина>".
+# Строки печатаются только после установки нового crl.pem:
+# при сбое gen-crl отзыв не считается выполненным
+RESULTS=()
+FAILED=0
+for CLIENT_NAME in "$@"; do
+  # Проверка: существует ли сертификат
+  if [[ ! -f "pki/issued/${CLIENT_NAME}.crt" ]]; then
+    RESULTS+=("MISSING ${CLIENT_NAME}")
+    FAILED=$((FAILED + 1))
+    continue
+  fi
+
+  # Отзыв сертификата
+  if ! ./easyrsa --batch revoke "$CLIENT_NAME" >&2; then
+    RESULTS+=("FAIL ${CLIENT_NAME} ошибка easyrsa revoke")
+    FAILED=$((FAILED + 1))
+    continue
+  fi
 
-# Отзыв сертификата
-./easyrsa --batch revoke "$CLIENT_NAME"
-./easyrsa gen-crl
+  # Очистка: удаление ключей и запроса
+  rm -f "pki/private/${CLIENT_NAME}.key" \
+        "pki/reqs/${CLIENT_NAME}.req" \
+        "pki/issued/${CLIENT_NAME}.crt"
 
-# Очистка: удаление ключей и запроса
-rm -f "pki/private/${CLIENT_NAME}.key" \
-      "pki/reqs/${CLIENT_NAME}.req" \
-      "pki/issued/${CLIENT_NAME}.crt"
+  # Удаление .ovpn, если есть
+  rm -f "$OUTPUT_DIR/${CLIENT_NAME}.ovpn"
 
-# Удаление .ovpn, если есть
-rm -f "$OUTPUT_DIR/${CLIENT_NAME}.ovpn"
+  RESULTS+=("OK ${CLIENT_NAME}")
+done
 
-# Обновление crl.pem
+# Обновление crl.pem один раз на весь пакет. Пересобирается и
+# без новых отзывов: MISSING после прошлого сбоя gen-crl
+# не должен остаться с устаревшим CRL
+./easyrsa gen-crl >&2
 cp pki/crl.pem "$CRL_PATH"
 chown nobody:nogroup "$CRL_PATH"
 
-echo "Сертификат ${CLIENT_NAME} отозван и удалён."
\ No newline at end of file
+printf '%s\n' "${RESULTS[@]}"
+
+if [[ $FAILED -gt 0 ]]; then
+  exit 1
+fi
@@ -1,24 +1,41 @@
-from fastapi import Depends
-from faststream.rabbit.fastapi import RabbitRouter
+from fastapi import Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
+from app.core.broker import rabbit_router as router
 from app.core.database import get_async_session
-from app.services.subscription import subscription_service
-
-
-router = RabbitRouter(url=settings.get_rabbit_url)
+from app.schemas.subscription import ExpiryJobStatus
+from app.services.expiry import expiry_job_runner
 
 
 @router.get(
     '/subs',
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=ExpiryJobStatus,
     summary='Деактивация подписок и уведомление клиентов',
     response_description=(
-        'Деактивация неоплаченных подписок и уведомление клиентов'
-        ' об окончании скорейшем.'),
+        'Запуск фоновой деактивации неоплаченных подписок и уведомления'
+        ' клиентов. Если задача уже выполняется, возвращается она.'),
 )
-async def notify_client_subs(
-    session: AsyncSession = Depends(get_async_session),
-):
+async def notify_client_subs() -> ExpiryJobStatus:
     """Деактивация подписок и уведомление об окончании."""
-    return await subscription_service.notify_about_subs(session, router)
+    return await expiry_job_runner.start(router)
+
+
+@router.get(
+    '/subs/{job_id}',
+    response_model=ExpiryJobStatus,
+    summary='Состояние задачи деактивации подписок',
+    response_description='Прогресс и длительность задачи',
+)
+async def notify_client_subs_status(
+    job_id: str,
+    session: AsyncSession = Depends(get_async_session),
+) -> ExpiryJobStatus:
+    """Прогресс задачи деактивации подписок."""
+    job = await expiry_job_runner.get(job_id, session)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Задача {job_id} не найдена',
+        )
+    return job
@@ -1,10 +1,8 @@
-from fastapi import Depends
 from faststream.rabbit.fastapi import RabbitRouter
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.database import get_async_session
-from app.services.subscription import subscription_service
+from app.schemas.subscription import ExpiryJobStatus
+from app.services.expiry import expiry_job_runner
 
 
 router = RabbitRouter(url=settings.get_rabbit_url)
@@ -12,13 +10,13 @@ router = RabbitRouter(url=settings.get_rabbit_url)
 
 @router.delete(
     '',
+    status_code=202,
+    response_model=ExpiryJobStatus,
     summary='Деактивация подписок и уведомление клиентов',
     response_description=(
         'Деактивация неоплаченных подписок и уведомление клиентов'
         ' об окончании скорейшем.'),
 )
-async def delete_subscriptions(
-    session: AsyncSession = Depends(get_async_session),
-):
+async def delete_subscriptions() -> ExpiryJobStatus:
     """Деактивация подписок и уведомление об окончании."""
-    return await subscription_service.notify_about_subs(session, router)
+    return await expiry_job_runner.start(router)
@@ -8,6 +8,7 @@ from app.schemas.server import (
     ServerWithRegionDB,
     ServerDB,
     ServerCreate,
+    ServerHealthDB,
     ServerUpdate,
 )
 
@@ -40,6 +41,19 @@ async def get_active_server(
     return await server_crud.get_active_servers(session)
 
 
+@router.get(
+    '/health',
+    response_model=list[ServerHealthDB],
+    summary='Состояние серверов',
+    response_description='Доступность и время ответа серверов',
+)
+async def get_servers_health(
+    session: AsyncSession = Depends(get_async_session),
+) -> list[ServerHealthDB]:
+    """Выдача состояния серверов по данным мониторинга."""
+    return await server_crud.get_all(session)
+
+
 @router.post(
     '/',
     response_model=ServerDB,
@@ -83,5 +97,4 @@ async def update_post(
     session: AsyncSession = Depends(get_async_session),
 ) -> ServerDB:
     """Редактирование поста."""
-    server = await server_crud.get_by_id(server_id, session)
-    return await server_crud.update(server, obj_in, session)
+    return await server_service.update(server_id, obj_in, session)
@@ -1,5 +1,6 @@
 """Импорты класса Base и всех моделей для Alembic."""
 from app.models.base import Base # noqa
+from app.models.expiry import ExpiryJob # noqa
 from app.models.payment import Payment, ReferralBonus # noqa
 from app.models.server import Certificate, Region, Server # noqa
 from app.models.subscription import Subscription, SubscriptionPrice # noqa
@@ -0,0 +1,39 @@
+from faststream.rabbit import ExchangeType, RabbitExchange
+from faststream.rabbit.fastapi import RabbitRouter
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.log_config import log_action_status
+from app.core.variables import SettingBroker
+
+rabbit_router = RabbitRouter(url=settings.get_rabbit_url)
+
+user_changed_exchange = RabbitExchange(
+    SettingBroker.USER_CHANGED_EXCHANGE,
+    type=ExchangeType.FANOUT,
+)
+servers_changed_exchange = RabbitExchange(
+    SettingBroker.SERVERS_CHANGED_EXCHANGE,
+    type=ExchangeType.FANOUT,
+)
+
+
+async def publish_event(
+    message: BaseModel,
+    exchange: RabbitExchange,
+) -> None:
+    """Рассылка события всем подписчикам (сброс кэшей бота).
+
+    Ошибка публикации не должна ломать основной запрос.
+    """
+    try:
+        await rabbit_router.broker.publish(
+            message=message,
+            exchange=exchange,
+            mandatory=False,
+        )
+    except Exception as e:
+        log_action_status(
+            error=e,
+            action_name=f'Публикация события в {exchange.name}',
+        )
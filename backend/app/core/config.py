@@ -1,4 +1,6 @@
 import os
+from typing import Literal
+
 from pydantic import ValidationError
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -32,6 +34,30 @@ class Settings(BaseSettings):
     RABBIT_PORT_WEB: int
     RABBIT_PORT_AMQP: int
     ALLOWED_IP_YOOKASSA: list[str]
+    NODE_HTTP2: bool = True
+    NODE_MAX_CONNECTIONS: int = 100
+    NODE_MAX_KEEPALIVE: int = 20
+    NODE_KEEPALIVE_EXPIRY: float = 60.0
+    NODE_CONNECT_TIMEOUT: float = 5.0
+    NODE_READ_TIMEOUT: float = 60.0
+    NODE_POOL_TIMEOUT: float = 5.0
+    NODE_PROBE_TIMEOUT: float = 2.0
+    NODE_JOB_POLL_INTERVAL: float = 1.0
+    NODE_JOB_TIMEOUT: float = 300.0
+    NODE_REVOKE_BATCH_SIZE: int = 500
+    NODE_CONCURRENCY: int = 4
+    EXPIRY_BATCH_SIZE: int = 500
+    EXPIRY_JOBS_KEEP: int = 20
+    REMINDER_HORIZONS: list[int] = [7, 3, 1]
+    NODE_PROBE_DEADLINE: float = 3.0
+    NODE_PROBE_GRACE: float = 0.2
+    NODE_PROBE_PREFERENCE: Literal['none', 'load', 'latency'] = 'load'
+    NODE_HEALTH_MONITOR: bool = True
+    PLACEMENT_STRATEGY: Literal[
+        'least_loaded', 'weighted_random', 'power_of_two'] = 'power_of_two'
+    NODE_HEALTH_INTERVAL: float = 15.0
+    NODE_HEALTH_RISE: int = 2
+    NODE_HEALTH_FALL: int = 3
 
     # model_config = SettingsConfigDict(
     #     env_file=os.path.join(os.path.dirname(os.path.abspath(__file__)),
@@ -0,0 +1,161 @@
+import asyncio
+import time
+from typing import Any, Iterable
+
+from httpx import AsyncClient, HTTPError, Limits, Response, Timeout
+
+from app.core.config import settings
+from app.core.log_config import log_action_status
+from app.core.variables import SettingServers
+
+
+class NodeClient:
+    """Общий пул HTTP/2 соединений к VPN нодам.
+
+    Создается на время жизни приложения: соединения с нодами
+    переиспользуются между запросами вместо DNS, TCP и TLS
+    рукопожатия на каждый вызов.
+    """
+
+    def __init__(
+        self,
+        latency_weight: float = 0.3,
+        concurrency: int = 4,
+    ) -> None:
+        self._client: AsyncClient | None = None
+        self.latency_weight = latency_weight
+        self.concurrency = concurrency
+        self.latency: dict[str, float] = {}
+        self.error_rate: dict[str, float] = {}
+        self._limits: dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> AsyncClient:
+        if self._client is None:
+            self._client = AsyncClient(
+                http2=settings.NODE_HTTP2,
+                headers=settings.get_headers_auth,
+                limits=Limits(
+                    max_connections=settings.NODE_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.NODE_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.NODE_KEEPALIVE_EXPIRY,
+                ),
+                timeout=Timeout(
+                    settings.NODE_READ_TIMEOUT,
+                    connect=settings.NODE_CONNECT_TIMEOUT,
+                    pool=settings.NODE_POOL_TIMEOUT,
+                ),
+            )
+        return self._client
+
+    def limit(self, domain: str) -> asyncio.Semaphore:
+        """Ограничение одновременных тяжелых операций на ноде."""
+        if domain not in self._limits:
+            self._limits[domain] = asyncio.Semaphore(self.concurrency)
+        return self._limits[domain]
+
+    @staticmethod
+    def get_url(domain: str, path: str) -> str:
+        return f'https://{domain}/{path}'
+
+    async def request(
+        self,
+        method: str,
+        domain: str,
+        path: str,
+        **kwargs: Any,
+    ) -> Response:
+        """Запрос к API ноды с авторизацией."""
+        return await self.client.request(
+            method, self.get_url(domain, path), **kwargs)
+
+    def _average(
+        self,
+        values: dict[str, float],
+        domain: str,
+        value: float,
+    ) -> None:
+        previous = values.get(domain)
+        values[domain] = value if previous is None else (
+            previous + self.latency_weight * (value - previous))
+
+    async def request_job(
+        self,
+        method: str,
+        domain: str,
+        path: str,
+        done_status: int,
+        **kwargs: Any,
+    ) -> Response:
+        """Запрос к ноде с ожиданием долгой операции.
+
+        Если нода поставила операцию в очередь (202 и job_id),
+        статус опрашивается до завершения, результат возвращается
+        как обычный ответ: done_status при успехе, 500 при ошибке.
+        """
+        response = await self.request(method, domain, path, **kwargs)
+        if response.status_code != 202:
+            return response
+        job_path = f'{SettingServers.API_JOBS}/{response.json().get('job_id')}'
+        deadline = time.monotonic() + settings.NODE_JOB_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(settings.NODE_JOB_POLL_INTERVAL)
+            job = (await self.request('GET', domain, job_path)).json()
+            if job.get('status') == 'done':
+                return Response(done_status, json=job.get('result'))
+            if job.get('status') == 'failed':
+                return Response(500, json=job.get('result'))
+        return Response(
+            504, json={'message': f'Задача {job_path} не завершена'})
+
+    def record_latency(self, domain: str, seconds: float) -> None:
+        """Скользящее среднее времени ответа ноды в секундах."""
+        self._average(self.latency, domain, seconds)
+
+    def record_result(self, domain: str, ok: bool) -> None:
+        """Скользящая доля неудачных проверок ноды."""
+        self._average(self.error_rate, domain, 0.0 if ok else 1.0)
+
+    async def probe(self, domain: str, timeout: float) -> bool:
+        """Проверка /health ноды, время ответа сохраняется."""
+        started = time.perf_counter()
+        try:
+            response = await self.request(
+                'GET', domain, SettingServers.API_CHECK_HEALTH,
+                timeout=timeout)
+            self.record_latency(domain, time.perf_counter() - started)
+            ok = (response.status_code == 200 and
+                  response.json().get('status') ==
+                  SettingServers.API_OK_HEALTH)
+        except (HTTPError, ValueError) as e:
+            log_action_status(
+                action_name='Проверка доступности сервера',
+                message=f'Сервер {domain} недоступен: {e!r}'
+            )
+            ok = False
+        self.record_result(domain, ok)
+        return ok
+
+    async def warm_up(self, domains: Iterable[str]) -> None:
+        """Открытие соединений к нодам при запуске приложения."""
+        domains = set(domains)
+        results = await asyncio.gather(
+            *(self.request('GET', domain, SettingServers.API_CHECK_HEALTH)
+              for domain in domains),
+            return_exceptions=True,
+        )
+        failed = [domain for domain, result in zip(domains, results)
+                  if isinstance(result, Exception)]
+        log_action_status(
+            action_name='Прогрев соединений к нодам',
+            message=(f'Подключено {len(domains) - len(failed)} '
+                     f'из {len(domains)}. Недоступны: {failed}'),
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+node_client = NodeClient(concurrency=settings.NODE_CONCURRENCY)
@@ -2,6 +2,7 @@ class SettingFieldDB:
     DEFAULT_FOR_COUNT = 0
     DEFAULT_MAX_CERT = 20
     DEFAULT_ACTIVE_SRV = False
+    DEFAULT_HEALTHY_SRV = True
     DEFAULT_ACTIVE_SUB = False
     DEFAULT_GIVEN_BONUS = False
     DEFAULT_BONUS = 100.00
@@ -35,9 +36,20 @@ class SettingLogging:
 
 class SettingServers:
     API_CERT_HOOK: str = 'certificates'
+    API_CERT_BATCH: str = 'batch'
+    API_CERT_REVOKE: str = 'revoke'
+    API_JOBS: str = 'jobs'
     API_CHECK_HEALTH: str = 'health'
     API_OK_HEALTH: str = 'ok'
     URL_TGBOT: str = 'https://t.me/livpnet_bot'
     YOOKASSA_NAME: str = 'YooKassa'
     DEFAULT_CURRENCY = 'RUB'
     DEFAULT_TYPE_CONFIRM = 'redirect'
+
+
+class SettingBroker:
+    QUEUE_DEACTIVATE_SUB: str = 'notify_deactivate_sub'
+    QUEUE_END_SUB: str = 'notify_end_sub'
+    QUEUE_SUBS_DIGEST: str = 'notify_subs_digest'
+    USER_CHANGED_EXCHANGE: str = 'user_changed'
+    SERVERS_CHANGED_EXCHANGE: str = 'servers_changed'
@@ -1,9 +1,10 @@
-from typing import Generic, Type, TypeVar, Sequence
+from typing import Generic, Literal, Type, TypeVar, Sequence
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.interfaces import ORMOption
 
 from app.core.database import commit_change
 from app.models.base import Base
@@ -11,11 +12,14 @@ from app.models.base import Base
 ModelType = TypeVar('ModelType', bound=Base)
 CreateSchemaType = TypeVar('CreateSchemaType', bound=BaseModel)
 UpdateSchemaType = TypeVar('UpdateSchemaType', bound=BaseModel)
+LoadProfile = Literal['minimal', 'menu', 'billing', 'full']
 
 
 class CRUDBase(Generic[CreateSchemaType, UpdateSchemaType, ModelType]):
     """Базовые CRUD операции."""
 
+    load_profiles: dict[str, Sequence[ORMOption]] = {}
+
     def __init__(
         self,
         model: Type[ModelType],
@@ -23,16 +27,28 @@ class CRUDBase(Generic[CreateSchemaType, UpdateSchemaType, ModelType]):
         """Инициализация модели для CRUD операций."""
         self.model = model
 
+    def load_options(self, profile: LoadProfile) -> Sequence[ORMOption]:
+        """Опции загрузки связей для профиля запроса.
+
+        Связи моделей сами не загружаются (lazy='raise'), каждый
+        запрос явно выбирает профиль с нужными данными.
+        """
+        if profile == 'minimal':
+            return ()
+        return self.load_profiles[profile]
+
     async def get_by_id(
         self,
         obj_id: int,
         session: AsyncSession,
+        profile: LoadProfile = 'minimal',
     ) -> ModelType | None:
         """Получение объекта модели по id."""
         db_obj = await session.execute(
-            select(self.model).where(
-                self.model.id == obj_id))
-        return db_obj.scalars().first()
+            select(self.model)
+            .options(*self.load_options(profile))
+            .where(self.model.id == obj_id))
+        return db_obj.unique().scalars().first()
 
     async def get_all(
         self,
@@ -0,0 +1,70 @@
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models.expiry import ExpiryJob
+from app.schemas.subscription import ExpiryJobStatus
+
+
+class CRUDExpiryJob(CRUDBase):
+    """CRUD операции для задач отключения подписок."""
+
+    async def get_by_job_id(
+        self,
+        job_id: str,
+        session: AsyncSession,
+    ) -> ExpiryJob | None:
+        return await session.scalar(
+            select(self.model).where(self.model.job_id == job_id))
+
+    async def get_running(self, session: AsyncSession) -> ExpiryJob | None:
+        """Последняя выполняющаяся задача."""
+        return await session.scalar(
+            select(self.model)
+            .where(self.model.status == 'running')
+            .order_by(self.model.started_at.desc())
+            .limit(1)
+        )
+
+    async def start(
+        self,
+        job: ExpiryJobStatus,
+        keep: int,
+        session: AsyncSession,
+    ) -> None:
+        """Запись новой задачи, вызывается под блокировкой запуска.
+
+        Задачи в статусе running к этому моменту никто не выполняет:
+        их процесс упал, они помечаются ошибкой. Хранятся только
+        keep последних задач.
+        """
+        await session.execute(
+            update(self.model)
+            .where(self.model.status == 'running')
+            .values(status='failed', error='Задача прервана')
+        )
+        await session.execute(insert(self.model).values(**job.model_dump()))
+        kept = (
+            select(self.model.id)
+            .order_by(self.model.started_at.desc())
+            .limit(keep)
+        )
+        await session.execute(
+            delete(self.model).where(self.model.id.not_in(kept)))
+        await session.commit()
+
+    async def save(
+        self,
+        job: ExpiryJobStatus,
+        session: AsyncSession,
+    ) -> None:
+        """Сохранение прогресса и итога задачи."""
+        await session.execute(
+            update(self.model)
+            .where(self.model.job_id == job.job_id)
+            .values(**job.model_dump(exclude={'job_id', 'started_at'}))
+        )
+        await session.commit()
+
+
+expiry_job_crud = CRUDExpiryJob(ExpiryJob)
@@ -1,6 +1,7 @@
+from collections import Counter
 from typing import Sequence
 
-from sqlalchemy import select
+from sqlalchemy import case, delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 
@@ -86,6 +87,78 @@ class CRUDServer(CRUDBase):
         )
         return db_objs.scalars().all()
 
+    async def adjust_cert_count(
+        self,
+        server_id: int,
+        delta: int,
+        session: AsyncSession,
+    ) -> Server | None:
+        """Атомарное изменение счетчика сертификатов сервера.
+
+        Один UPDATE ... SET current_cert_count = current_cert_count
+        + delta RETURNING: одновременные выдачи на один сервер
+        не теряют изменений, is_active пересчитывается там же.
+        Загруженный в сессию сервер получает новые значения.
+        """
+        count = self.model.current_cert_count + delta
+        count = case((count < 0, 0), else_=count)
+        result = await session.execute(
+            update(self.model)
+            .where(self.model.id == server_id)
+            .values(
+                current_cert_count=count,
+                is_active=count < self.model.max_certificates,
+            )
+            .returning(self.model)
+            .execution_options(
+                synchronize_session=False, populate_existing=True)
+        )
+        return result.scalars().first()
+
+    async def reserve(
+        self,
+        server_id: int,
+        count: int,
+        session: AsyncSession,
+    ) -> Server | None:
+        """Резервирование count мест на сервере до выпуска сертификатов.
+
+        Счетчик увеличивается условным UPDATE ... WHERE
+        current_cert_count + count <= max_certificates: проверка
+        и занятие мест атомарны, одновременные покупки не превышают
+        лимит сервера. None - свободных мест не хватает.
+        Резерв сразу коммитится вместе со всем, что есть в сессии.
+        """
+        count_expr = self.model.current_cert_count + count
+        result = await session.execute(
+            update(self.model)
+            .where(
+                self.model.id == server_id,
+                count_expr <= self.model.max_certificates,
+            )
+            .values(
+                current_cert_count=count_expr,
+                is_active=count_expr < self.model.max_certificates,
+            )
+            .returning(self.model)
+            .execution_options(
+                synchronize_session=False, populate_existing=True)
+        )
+        server = result.scalars().first()
+        await commit_change(session)
+        return server
+
+    async def release(
+        self,
+        server_id: int,
+        count: int,
+        session: AsyncSession,
+    ) -> Server | None:
+        """Освобождение зарезервированных мест сервера."""
+        server = await self.adjust_cert_count(server_id, -count, session)
+        await commit_change(session)
+        return server
+
 
 server_crud = CRUDServer(Server)
 
@@ -101,31 +174,71 @@ class CRUDCertificate(CRUDBase):
         """Создание объекта сертификата."""
         db_obj = self.model(**obj_in.model_dump())
         session.add(db_obj)
-        server = await server_crud.get_by_id(obj_in.server_id, session)
-        if server:
-            server.current_cert_count += 1
-            if server.max_certificates <= server.current_cert_count:
-                server.is_active = False
-            else:
-                server.is_active = True
-            session.add(server)
+        if obj_in.server_id:
+            await server_crud.adjust_cert_count(obj_in.server_id, 1, session)
         return await commit_change(session, db_obj)
 
+    async def create_many(
+        self,
+        objs_in: Sequence[CertificateCreateDB],
+        session: AsyncSession,
+        reserved: bool = False,
+    ) -> None:
+        """Создание сертификатов одним INSERT и пересчет
+        серверов одним коммитом.
+
+        reserved - места уже заняты server_crud.reserve,
+        счетчики серверов не меняются.
+        """
+        if not objs_in:
+            return None
+        await session.execute(
+            insert(self.model), [obj_in.model_dump() for obj_in in objs_in])
+        if not reserved:
+            added = Counter(obj_in.server_id for obj_in in objs_in)
+            await self.adjust_servers(added, 1, session)
+        await commit_change(session)
+
     async def delete(
         self,
         db_obj: Certificate,
         session: AsyncSession,
     ) -> Certificate:
         """Удаление объекта модели."""
-        server = await server_crud.get_by_id(db_obj.server_id, session)
-        if server and server.current_cert_count > 0:
-            server.current_cert_count -= 1
-            if server.max_certificates > server.current_cert_count:
-                server.is_active = True
-            session.add(server)
+        if db_obj.server_id:
+            await server_crud.adjust_cert_count(db_obj.server_id, -1, session)
         await session.delete(db_obj)
         await commit_change(session)
         return db_obj
 
+    async def delete_many(
+        self,
+        db_objs: Sequence[Certificate],
+        session: AsyncSession,
+    ) -> None:
+        """Удаление сертификатов одним DELETE и пересчет
+        серверов одним коммитом."""
+        if db_objs:
+            await session.execute(
+                delete(self.model)
+                .where(self.model.id.in_([db_obj.id for db_obj in db_objs]))
+                .execution_options(synchronize_session='fetch')
+            )
+            removed = Counter(db_obj.server_id for db_obj in db_objs)
+            await self.adjust_servers(removed, -1, session)
+        await commit_change(session)
+
+    @staticmethod
+    async def adjust_servers(
+        counts: Counter,
+        sign: int,
+        session: AsyncSession,
+    ) -> None:
+        """Изменение счетчиков серверов на число их сертификатов."""
+        for server_id, count in sorted(counts.items()):
+            if server_id:
+                await server_crud.adjust_cert_count(
+                    server_id, sign * count, session)
+
 
 certificate_crud = CRUDCertificate(Certificate)
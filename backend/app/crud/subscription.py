@@ -1,12 +1,18 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
 
-from sqlalchemy import func, select
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.crud.base import CRUDBase
 from app.models.server import Certificate
-from app.models.subscription import Subscription, SubscriptionPrice
+from app.models.subscription import (
+    Subscription,
+    SubscriptionPrice,
+    SubscriptionReminder,
+)
 from app.schemas.subscription import SubscriptionDuration, SubscriptionType
 
 
@@ -41,42 +47,130 @@ class CRUDSubscription(CRUDBase):
         )
         return db_obj.scalars().first()
 
-    async def get_expired_subs(
+    async def count_expired_subs(
         self,
         session: AsyncSession,
-    ) -> list[Subscription]:
-        """Получить подписки, которые уже истекли, но все еще активны."""
+    ) -> int:
+        """Количество истекших, но все еще активных подписок."""
         today = datetime.now(timezone.utc).date()
 
+        db_obj = await session.execute(
+            select(func.count())
+            .select_from(self.model)
+            .where(
+                self.model.end_date < today,
+                self.model.is_active,
+            )
+        )
+        return db_obj.scalar_one()
+
+    async def get_notify_user_ids(
+        self,
+        after_user_id: int,
+        limit: int,
+        days_ahead: int,
+        session: AsyncSession,
+    ) -> Sequence[int]:
+        """Следующие limit пользователей после after_user_id, у которых
+        есть активные подписки, истекшие или истекающие в ближайшие
+        days_ahead дней."""
+        until = (datetime.now(timezone.utc).date() +
+                 timedelta(days=days_ahead + 1))
+
+        db_obj = await session.execute(
+            select(self.model.user_id)
+            .where(
+                self.model.end_date < until,
+                self.model.is_active,
+                self.model.user_id > after_user_id,
+            )
+            .group_by(self.model.user_id)
+            .order_by(self.model.user_id)
+            .limit(limit)
+        )
+        return db_obj.scalars().all()
+
+    async def claim_expired_subs(
+        self,
+        first_user_id: int,
+        last_user_id: int,
+        session: AsyncSession,
+    ) -> Sequence[Subscription]:
+        """Отключить истекшие подписки пользователей из диапазона.
+
+        Одним UPDATE ... RETURNING, без загрузки и изменения
+        объектов по одному. Изменение не сохраняется до коммита.
+        """
+        today = datetime.now(timezone.utc).date()
+        claimed = (
+            update(self.model)
+            .where(
+                self.model.end_date < today,
+                self.model.is_active,
+                self.model.user_id.between(first_user_id, last_user_id),
+            )
+            .values(is_active=False)
+            .returning(self.model)
+        )
         db_obj = await session.execute(
             select(self.model)
+            .from_statement(claimed)
             .options(
                 selectinload(self.model.certificates),
                 selectinload(self.model.user),
                 selectinload(self.model.region))
-            .where(
-                self.model.end_date < today,
-                self.model.is_active.is_(True),
-            )
+            .execution_options(populate_existing=True)
         )
-        return db_obj.unique().scalars().all()
+        return db_obj.scalars().all()
 
-    async def get_expiring_subs(
+    async def claim_expiring_subs(
         self,
+        first_user_id: int,
+        last_user_id: int,
+        horizons: Sequence[int],
         session: AsyncSession,
-    ) -> list[Subscription]:
-        """Получить подписки, срок которых истекает завтра."""
+    ) -> Sequence[Subscription]:
+        """Подписки пользователей из диапазона, о которых пора напомнить.
+
+        Горизонты делят ближайшие дни на интервалы вида
+        [сегодня + предыдущий горизонт + 1, сегодня + горизонт + 1),
+        условия по end_date без функций используют индекс. Напоминание
+        каждого интервала отмечается в SubscriptionReminder через
+        INSERT ... ON CONFLICT DO NOTHING RETURNING и выдается один раз.
+        """
         today = datetime.now(timezone.utc).date()
+        claimed_ids = []
+        start = today
+        for horizon in sorted(set(horizons)):
+            end = today + timedelta(days=horizon + 1)
+            due = select(
+                self.model.id,
+                self.model.end_date,
+                literal(horizon),
+            ).where(
+                self.model.end_date >= start,
+                self.model.end_date < end,
+                self.model.is_active,
+                self.model.user_id.between(first_user_id, last_user_id),
+            )
+            claimed = await session.execute(
+                insert(SubscriptionReminder)
+                .from_select(['subscription_id', 'end_date', 'horizon'], due)
+                .on_conflict_do_nothing(
+                    constraint='uq_subscription_reminder')
+                .returning(SubscriptionReminder.subscription_id)
+            )
+            claimed_ids.extend(claimed.scalars().all())
+            start = end
+        if not claimed_ids:
+            return []
 
         db_obj = await session.execute(
             select(self.model)
             .options(
                 selectinload(self.model.user),
                 selectinload(self.model.region))
-            .where(
-                func.date(self.model.end_date) == today,
-                self.model.is_active.is_(True),
-            )
+            .where(self.model.id.in_(claimed_ids))
         )
         return db_obj.unique().scalars().all()
 
@@ -1,27 +1,90 @@
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 
-from app.crud.base import CRUDBase
+from app.core.database import commit_change
+from app.crud.base import CRUDBase, LoadProfile
+from app.models.server import Certificate
 from app.models.subscription import Subscription
 from app.models.user import User
+from app.schemas.user import UserCreate
 
 
 class CRUDUser(CRUDBase):
     """CRUD операции для модели с пользователями."""
 
-    async def get_by_tg_id(self, tg_id: int,
-                           session: AsyncSession) -> User | None:
+    load_profiles = {
+        # Меню бота: подписки с регионами, один запрос
+        'menu': (
+            joinedload(User.subscription).joinedload(Subscription.region),
+        ),
+        # Оформление и продление: еще сертификаты и бонусы
+        'billing': (
+            selectinload(User.subscription).options(
+                joinedload(Subscription.region),
+                selectinload(Subscription.certificates)),
+            selectinload(User.invites),
+        ),
+        'full': (
+            selectinload(User.subscription).options(
+                joinedload(Subscription.region),
+                selectinload(Subscription.certificates)
+                .joinedload(Certificate.server)),
+            selectinload(User.payments),
+            selectinload(User.invites),
+            selectinload(User.referrals),
+        ),
+    }
+
+    async def get_by_tg_id(
+        self,
+        tg_id: int,
+        session: AsyncSession,
+        profile: LoadProfile = 'minimal',
+    ) -> User | None:
         """Получение объекта пользователя по id телеграмма."""
         db_obj = await session.execute(
             select(self.model)
             .where(self.model.telegram_id == tg_id)
-            .options(
-                joinedload(self.model.subscription)
-                .joinedload(Subscription.region)
+            .options(*self.load_options(profile))
+        )
+        return db_obj.unique().scalars().first()
+
+    async def get_or_create(
+        self,
+        obj_in: UserCreate,
+        session: AsyncSession,
+    ) -> User:
+        """Создание пользователя одним запросом без гонки.
+
+        INSERT ... ON CONFLICT (telegram_id) DO UPDATE ... RETURNING
+        возвращает строку и при одновременной регистрации, id
+        пригласившего ищется подзапросом в том же запросе.
+        """
+        refer_from_id = None
+        if obj_in.refer_from_id:
+            refer_from_id = (
+                select(self.model.id)
+                .where(self.model.telegram_id == obj_in.refer_from_id)
+                .scalar_subquery()
             )
+        upsert = insert(self.model).values(
+            telegram_id=obj_in.telegram_id,
+            refer_from_id=refer_from_id,
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[self.model.telegram_id],
+            set_={'updated_at': func.now()},
+        ).returning(self.model)
+        db_obj = await session.execute(
+            select(self.model)
+            .from_statement(upsert)
+            .execution_options(populate_existing=True)
         )
-        return db_obj.scalars().first()
+        user = db_obj.scalars().one()
+        await commit_change(session)
+        return user
 
 
 user_crud = CRUDUser(User)
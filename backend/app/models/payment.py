@@ -6,6 +6,7 @@ from sqlalchemy import (
     Enum,
     Boolean,
     ForeignKey,
+    Index,
     JSON,
     Numeric,
     String,
@@ -59,6 +60,9 @@ class Payment(Base):
         remote_side='User.id',
         back_populates='payments',
     )
+    __table_args__ = (
+        Index('ix_payment_user_id_status', 'user_id', 'status'),
+    )
 
 
 class ReferralBonus(Base):
@@ -97,4 +101,5 @@ class ReferralBonus(Base):
     )
     __table_args__ = (
         UniqueConstraint('user_id', 'invited_id', name='uq_user_invited'),
+        Index('ix_referralbonus_invited_id', 'invited_id'),
     )
@@ -1,7 +1,18 @@
 import enum
+from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    true,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -71,6 +82,20 @@ class Server(Base):
         default=SettingFieldDB.DEFAULT_FOR_COUNT,
         nullable=False,
     )
+    is_healthy: Mapped[bool] = mapped_column(
+        Boolean,
+        default=SettingFieldDB.DEFAULT_HEALTHY_SRV,
+        server_default=true(),
+        nullable=False,
+    )
+    latency_ms: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True,
+    )
+    health_checked_at: Mapped[datetime | None] = mapped_column(
+        DateTime,
+        nullable=True,
+    )
     region_id: Mapped[int] = mapped_column(
         ForeignKey('region.id'),
         nullable=False,
@@ -84,6 +109,10 @@ class Server(Base):
         'Certificate',
         back_populates='server',
     )
+    __table_args__ = (
+        Index('ix_server_region_id_protocol_active',
+              'region_id', 'protocol', postgresql_where=is_active),
+    )
 
 
 class Certificate(Base):
@@ -117,3 +146,7 @@ class Certificate(Base):
         remote_side='Subscription.id',
         back_populates='certificates',
     )
+    __table_args__ = (
+        Index('ix_certificate_subscription_id', 'subscription_id'),
+        Index('ix_certificate_server_id', 'server_id'),
+    )
@@ -8,6 +8,8 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Enum,
+    Index,
+    Integer,
     Numeric,
     UniqueConstraint
 )
@@ -72,7 +74,32 @@ class Subscription(Base):
     certificates: Mapped[list['Certificate']] = relationship(
         'Certificate',
         back_populates='subscription',
-        lazy='joined',
+        lazy='raise',
+    )
+    __table_args__ = (
+        Index('ix_subscription_end_date_active',
+              'end_date', postgresql_where=is_active),
+        Index('ix_subscription_user_id', 'user_id'),
+    )
+
+
+class SubscriptionReminder(Base):
+    """Отправленные напоминания об окончании подписки.
+
+    Одна запись на подписку, дату окончания и горизонт: повторный
+    запуск рассылки не отправляет напоминание второй раз, а после
+    продления новая дата окончания снова получает напоминания.
+    """
+
+    subscription_id: Mapped[int] = mapped_column(
+        ForeignKey('subscription.id', ondelete='CASCADE'),
+        nullable=False,
+    )
+    end_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    horizon: Mapped[int] = mapped_column(Integer, nullable=False)
+    __table_args__ = (
+        UniqueConstraint('subscription_id', 'end_date', 'horizon',
+                         name='uq_subscription_reminder'),
     )
 
 
@@ -37,25 +37,26 @@ class User(Base):
         'User',
         back_populates='refer_from',
     )
+    # Связи загружаются только явно, профилем в CRUDUser
     subscription: Mapped[list['Subscription']] = relationship(
         'Subscription',
         back_populates='user',
-        lazy='joined',
+        lazy='raise',
     )
     payments: Mapped[list['Payment']] = relationship(
         'Payment',
         back_populates='user',
-        lazy='selectin',
+        lazy='raise',
     )
     invites: Mapped[list['ReferralBonus']] = relationship(
         'ReferralBonus',
         back_populates='invited',
         foreign_keys='ReferralBonus.invited_id',
-        lazy='selectin',
+        lazy='raise',
     )
     referrals: Mapped[list['ReferralBonus']] = relationship(
         'ReferralBonus',
         back_populates='user',
         foreign_keys='ReferralBonus.user_id',
-        lazy='selectin',
+        lazy='raise',
     )
@@ -1,3 +1,4 @@
+from datetime import datetime
 from ipaddress import ip_address
 from pydantic import (
     BaseModel,
@@ -66,7 +67,24 @@ class ServerDB(ServerBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ServerHealthDB(ServerDB):
+    """Состояние ноды по данным монитора."""
+
+    id: int = Field(description='ID сервера')
+    is_healthy: bool = Field(description='Нода отвечает на проверки')
+    latency_ms: int | None = Field(default=None,
+                                   description='Время ответа, мс')
+    health_checked_at: datetime | None = Field(
+        default=None, description='Время последней проверки')
+
+
 class ServerWithRegionDB(ServerDB):
     """Схема выдачи данных о сервере."""
 
     region: RegionDB
+
+
+class ServerChangedEvent(BaseModel):
+    """Событие об изменении активности или загрузки сервера."""
+
+    server_id: int | None = Field(default=None, description='ID сервера')
@@ -1,5 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
+from typing import Literal
 
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 
@@ -98,10 +99,28 @@ class SubscriptionNotifyDB(BaseModel):
         default=None,
         description='Телеграм id клиента',
     )
+    days_left: int | None = Field(
+        default=None,
+        description='Дней до окончания подписки',
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class SubscriptionNotifyDigest(BaseModel):
+    """Уведомления пользователя за один запуск рассылки."""
+
+    telegram_id: int = Field(description='Телеграм id клиента')
+    expired: list[SubscriptionNotifyDB] = Field(
+        default_factory=list,
+        description='Отключенные подписки',
+    )
+    expiring: list[SubscriptionNotifyDB] = Field(
+        default_factory=list,
+        description='Подписки, которые скоро заканчиваются',
+    )
+
+
 class SubscriptionInfoShortDB(SubscriptionNotifyDB):
     """Информация о подписке пользователя."""
 
@@ -143,3 +162,30 @@ class CertificateCreateDB(BaseModel):
     )
     server_id: int = Field(description='ID сервера')
     subscription_id: int = Field(description='ID подписки')
+
+
+class ExpiryJobStatus(BaseModel):
+    """Состояние фоновой задачи отключения истекших подписок."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    job_id: str = Field(description='ID задачи')
+    status: Literal['running', 'done', 'failed'] = Field(
+        default='running',
+        description='Статус задачи',
+    )
+    started_at: datetime = Field(description='Время запуска')
+    finished_at: datetime | None = Field(
+        default=None,
+        description='Время завершения',
+    )
+    duration: float | None = Field(
+        default=None,
+        description='Длительность в секундах',
+    )
+    total: int = Field(default=0, description='Истекших подписок на старте')
+    processed: int = Field(default=0, description='Отключено подписок')
+    failed: int = Field(default=0, description='Подписок с ошибкой отзыва')
+    remaining: int = Field(default=0, description='Осталось обработать')
+    notified: int = Field(default=0, description='Отправлено уведомлений')
+    error: str | None = Field(default=None, description='Текст ошибки')
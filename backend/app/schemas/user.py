@@ -25,3 +25,9 @@ class UserDB(UserBase):
     )
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class UserChangedEvent(BaseModel):
+    """Событие об изменении подписок или платежей пользователя."""
+
+    telegram_id: int = Field(description='telegram_id пользователя')
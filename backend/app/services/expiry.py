@@ -0,0 +1,146 @@
+import asyncio
+import contextlib
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from fastapi import HTTPException, status
+from faststream.rabbit.fastapi import RabbitRouter
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+from app.core.database import engine, get_session_database
+from app.core.log_config import log_action_status
+from app.crud.expiry import expiry_job_crud
+from app.schemas.subscription import ExpiryJobStatus
+from app.services.subscription import subscription_service
+
+# Ключ advisory lock PostgreSQL для запуска задачи
+EXPIRY_LOCK_KEY = 7_310_001
+
+
+class ExpiryJobRunner:
+    """Фоновый запуск отключения истекших подписок.
+
+    Запрос только ставит задачу и сразу возвращает ее id, ход
+    выполнения доступен по id. Одновременно выполняется не больше
+    одной задачи на все воркеры и реплики backend: задача держит
+    advisory lock на своем соединении с БД, повторный запуск
+    возвращает текущую. Задачи и прогресс хранятся в таблице
+    expiryjob, при падении процесса блокировка снимается вместе
+    с соединением.
+    """
+
+    def __init__(self, keep: int) -> None:
+        self.keep = keep
+        self._task: asyncio.Task | None = None
+        self._connection: AsyncConnection | None = None
+
+    async def get(
+        self,
+        job_id: str,
+        session: AsyncSession,
+    ) -> ExpiryJobStatus | None:
+        job = await expiry_job_crud.get_by_job_id(job_id, session)
+        return None if job is None else ExpiryJobStatus.model_validate(job)
+
+    async def start(self, router: RabbitRouter) -> ExpiryJobStatus:
+        """Запуск задачи, если она еще не выполняется."""
+        connection = await engine.connect()
+        try:
+            locked = await connection.scalar(
+                select(func.pg_try_advisory_lock(EXPIRY_LOCK_KEY)))
+            await connection.commit()
+            if not locked:
+                await connection.close()
+                return await self._current()
+            job = ExpiryJobStatus(
+                job_id=uuid4().hex,
+                started_at=datetime.now(timezone.utc),
+            )
+            async with get_session_database() as session:
+                await expiry_job_crud.start(job, self.keep, session)
+        except BaseException:
+            await self._unlock(connection)
+            raise
+        self._connection = connection
+        self._task = asyncio.create_task(self._run(job, router, connection))
+        return job
+
+    async def _current(self) -> ExpiryJobStatus:
+        async with get_session_database() as session:
+            job = await expiry_job_crud.get_running(session)
+        if job is None:
+            # Блокировка взята, но задача еще не записана
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail='Задача отключения подписок уже запускается',
+            )
+        return ExpiryJobStatus.model_validate(job)
+
+    @staticmethod
+    async def _unlock(connection: AsyncConnection) -> None:
+        """Снятие блокировки: соединение возвращается в пул,
+        сессионная блокировка сама не снимается."""
+        with contextlib.suppress(Exception):
+            await connection.scalar(
+                select(func.pg_advisory_unlock(EXPIRY_LOCK_KEY)))
+            await connection.commit()
+        await connection.close()
+
+    @staticmethod
+    async def save(job: ExpiryJobStatus) -> None:
+        async with get_session_database() as session:
+            await expiry_job_crud.save(job, session)
+
+    async def _run(
+        self,
+        job: ExpiryJobStatus,
+        router: RabbitRouter,
+        connection: AsyncConnection,
+    ) -> None:
+        started = time.monotonic()
+        try:
+            await subscription_service.notify_about_subs(
+                router, job, self.save)
+            job.status = 'done'
+        except asyncio.CancelledError:
+            job.status = 'failed'
+            job.error = 'Задача остановлена'
+            raise
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+            log_action_status(
+                error=e, action_name='Отключение истекших подписок')
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            job.duration = time.monotonic() - started
+            try:
+                await self.save(job)
+            except Exception as e:
+                log_action_status(
+                    error=e, action_name='Отключение истекших подписок')
+            finally:
+                await self._unlock(connection)
+        log_action_status(
+            action_name='Отключение истекших подписок',
+            message=(f'Задача {job.job_id}: отключено {job.processed}, '
+                     f'ошибок {job.failed}, уведомлений {job.notified} '
+                     f'за {job.duration:.1f} сек.')
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        # Задача могла быть отменена до начала выполнения
+        if self._connection is not None and not self._connection.closed:
+            await self._unlock(self._connection)
+        self._connection = None
+
+
+expiry_job_runner = ExpiryJobRunner(keep=settings.EXPIRY_JOBS_KEEP)
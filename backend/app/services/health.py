@@ -0,0 +1,142 @@
+import asyncio
+import contextlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Sequence
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_session_database
+from app.core.log_config import log_action_status
+from app.core.node_client import node_client
+from app.models.server import Server
+from app.services.server import server_service
+
+
+@dataclass(slots=True)
+class NodeHealth:
+    """Состояние ноды в таблице монитора."""
+
+    healthy: bool
+    latency_ms: int | None = None
+    checked_at: datetime | None = None
+    successes: int = 0
+    failures: int = 0
+
+
+class NodeHealthMonitor:
+    """Фоновая проверка нод с таблицей здоровья в памяти и в БД.
+
+    Нода считается недоступной после fall_threshold неудачных
+    проверок подряд и снова доступной после rise_threshold удачных,
+    единичный сбой не переключает состояние. Выбор сервера при
+    выдаче сертификатов читает таблицу без сетевых запросов.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        timeout: float,
+        rise_threshold: int,
+        fall_threshold: int,
+    ) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.rise_threshold = rise_threshold
+        self.fall_threshold = fall_threshold
+        self.table: dict[int, NodeHealth] = {}
+        self._task: asyncio.Task | None = None
+
+    def is_healthy(self, server: Server) -> bool:
+        """Состояние из таблицы, до первой проверки - из БД."""
+        health = self.table.get(server.id)
+        return server.is_healthy if health is None else health.healthy
+
+    def healthy_servers(self, servers: Sequence[Server]) -> list[Server]:
+        return [server for server in servers if self.is_healthy(server)]
+
+    def apply(self, server: Server, ok: bool, now: datetime) -> bool:
+        """Учет результата проверки, True - состояние изменилось."""
+        health = self.table.get(server.id)
+        if health is None:
+            health = self.table[server.id] = NodeHealth(
+                healthy=server.is_healthy)
+        latency = node_client.latency.get(server.domain_name)
+        health.latency_ms = (
+            int(latency * 1000) if ok and latency is not None else None)
+        health.checked_at = now
+        if ok:
+            health.successes += 1
+            health.failures = 0
+            if not health.healthy and health.successes >= self.rise_threshold:
+                health.healthy = True
+                return True
+        else:
+            health.failures += 1
+            health.successes = 0
+            if health.healthy and health.failures >= self.fall_threshold:
+                health.healthy = False
+                return True
+        return False
+
+    async def check(self, session: AsyncSession) -> None:
+        """Один цикл проверки всех серверов."""
+        servers = (await session.execute(select(Server))).scalars().all()
+        results = await asyncio.gather(*(
+            node_client.probe(server.domain_name, self.timeout)
+            for server in servers
+        ))
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        changed = []
+        rows = []
+        for server, ok in zip(servers, results):
+            if self.apply(server, ok, now):
+                changed.append(server)
+            health = self.table[server.id]
+            rows.append(dict(
+                id=server.id,
+                is_healthy=health.healthy,
+                latency_ms=health.latency_ms,
+                health_checked_at=health.checked_at,
+            ))
+        if rows:
+            await session.execute(update(Server), rows)
+        await session.commit()
+        for server in changed:
+            log_action_status(
+                action_name='Мониторинг нод',
+                message=(f'Сервер {server.domain_name} '
+                         f'{'доступен' if self.table[server.id].healthy
+                            else 'недоступен'}')
+            )
+            await server_service.notify_changed(server.id)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with get_session_database() as session:
+                    await self.check(session)
+            except Exception as e:
+                log_action_status(error=e, action_name='Мониторинг нод')
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+node_health_monitor = NodeHealthMonitor(
+    interval=settings.NODE_HEALTH_INTERVAL,
+    timeout=settings.NODE_PROBE_TIMEOUT,
+    rise_threshold=settings.NODE_HEALTH_RISE,
+    fall_threshold=settings.NODE_HEALTH_FALL,
+)
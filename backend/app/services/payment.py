@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from yookassa import Configuration, Payment
 from yookassa.domain.exceptions import ApiError
 
+from app.core.broker import publish_event, user_changed_exchange
 from app.core.config import settings
 from app.core.log_config import log_action_status
 from app.core.variables import SettingServers
@@ -22,6 +23,7 @@ from app.schemas.payment import (
     YooKassaWebhookNotification,
 )
 from app.schemas.subscription import SubscriptionCreate
+from app.schemas.user import UserChangedEvent
 
 
 Configuration.account_id = settings.SHOP_ID
@@ -141,6 +143,10 @@ async def check_status_from_yookassa(
             return None, False
         upd_status = PaymentUpdateStatus(status=data_in.object.status)
         payment = await payment_crud.update(payment, upd_status, session)
+        await publish_event(
+            UserChangedEvent(telegram_id=payment.user.telegram_id),
+            user_changed_exchange,
+        )
         if (not payment.user.invites and
             payment.status == PaymentStatus.success and
             payment.user.refer_from_id):
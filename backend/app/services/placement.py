@@ -0,0 +1,123 @@
+"""Выбор сервера для новых сертификатов.
+
+Модуль не зависит от БД и настроек: кандидаты собираются
+в сервисе подписок, здесь только оценка и стратегии выбора.
+Распределение можно проверить симуляцией:
+python -m app.services.placement
+"""
+import random
+import statistics
+from dataclasses import dataclass
+from typing import Any, Callable, Sequence
+
+LATENCY_REFERENCE = 0.5
+LATENCY_WEIGHT = 0.3
+ERROR_WEIGHT = 1.0
+MIN_WEIGHT = 0.01
+
+
+@dataclass(slots=True, frozen=True)
+class Candidate:
+    """Сервер-кандидат и его текущие показатели."""
+
+    server: Any
+    load: float
+    latency: float | None = None
+    error_rate: float = 0.0
+
+    @property
+    def score(self) -> float:
+        """Оценка кандидата, меньше - лучше."""
+        latency = min((self.latency or 0.0) / LATENCY_REFERENCE, 1.0)
+        return (self.load + LATENCY_WEIGHT * latency +
+                ERROR_WEIGHT * self.error_rate)
+
+
+Strategy = Callable[[Sequence[Candidate], random.Random], Candidate]
+
+
+def least_loaded(
+    candidates: Sequence[Candidate],
+    rng: random.Random,
+) -> Candidate:
+    """Кандидат с лучшей оценкой."""
+    return min(candidates, key=lambda c: c.score)
+
+
+def weighted_random(
+    candidates: Sequence[Candidate],
+    rng: random.Random,
+) -> Candidate:
+    """Случайный кандидат, вес тем больше, чем лучше оценка."""
+    weights = [max(1.0 - c.score, MIN_WEIGHT) for c in candidates]
+    return rng.choices(candidates, weights=weights)[0]
+
+
+def power_of_two(
+    candidates: Sequence[Candidate],
+    rng: random.Random,
+) -> Candidate:
+    """Лучший из двух случайных кандидатов."""
+    if len(candidates) < 2:
+        return candidates[0]
+    return least_loaded(rng.sample(candidates, 2), rng)
+
+
+STRATEGIES: dict[str, Strategy] = {
+    'least_loaded': least_loaded,
+    'weighted_random': weighted_random,
+    'power_of_two': power_of_two,
+}
+
+
+def choose(
+    candidates: Sequence[Candidate],
+    strategy: str = 'power_of_two',
+    rng: random.Random | None = None,
+) -> Candidate | None:
+    """Выбор кандидата, заполненные серверы не рассматриваются."""
+    available = [c for c in candidates if c.load < 1.0]
+    if not available:
+        return None
+    return STRATEGIES[strategy](available, rng or random.Random())
+
+
+def simulate(
+    strategy: str,
+    capacities: Sequence[int],
+    latencies: Sequence[float],
+    error_rates: Sequence[float],
+    placements: int,
+    seed: int = 0,
+) -> list[int]:
+    """Размещение подписок по серверам, возвращает число на каждом."""
+    rng = random.Random(seed)
+    counts = [0] * len(capacities)
+    for _ in range(placements):
+        candidates = [
+            Candidate(
+                server=index,
+                load=counts[index] / capacity,
+                latency=latencies[index],
+                error_rate=error_rates[index],
+            )
+            for index, capacity in enumerate(capacities)
+        ]
+        chosen = choose(candidates, strategy, rng)
+        if chosen is None:
+            break
+        counts[chosen.server] += 1
+    return counts
+
+
+if __name__ == '__main__':
+    capacities = [200, 200, 200, 400, 100]
+    latencies = [0.05, 0.08, 0.3, 0.1, 0.05]
+    error_rates = [0.0, 0.0, 0.0, 0.05, 0.2]
+    for name in STRATEGIES:
+        counts = simulate(name, capacities, latencies, error_rates, 600)
+        loads = [count / capacity
+                 for count, capacity in zip(counts, capacities)]
+        print(f'{name:16} {counts} '
+              f'загрузка: {[round(load, 2) for load in loads]} '
+              f'σ={statistics.pstdev(loads):.3f}')
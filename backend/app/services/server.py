@@ -1,10 +1,11 @@
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.broker import publish_event, servers_changed_exchange
 from app.crud.server import server_crud
 from app.core.log_config import log_action_status
 from app.models.server import Server
-from app.schemas.server import ServerCreate
+from app.schemas.server import ServerChangedEvent, ServerCreate, ServerUpdate
 from app.validators.base import get_or_404
 
 
@@ -14,6 +15,14 @@ class ServerService:
     model = Server
     crud = server_crud
 
+    @staticmethod
+    async def notify_changed(server_id: int | None = None) -> None:
+        """Сброс каталога серверов в боте."""
+        await publish_event(
+            ServerChangedEvent(server_id=server_id),
+            servers_changed_exchange,
+        )
+
     async def create(
         self,
         obj_in: ServerCreate,
@@ -36,7 +45,21 @@ class ServerService:
                 )
             data['region_id'] = region.id
 
-        return await self.crud.create(data, session)
+        server = await self.crud.create(data, session)
+        await self.notify_changed(server.id)
+        return server
+
+    async def update(
+        self,
+        server_id: int,
+        obj_in: ServerUpdate,
+        session: AsyncSession,
+    ) -> Server:
+        """Обновление сервера."""
+        server = await get_or_404(self.crud, server_id, session)
+        server = await self.crud.update(server, obj_in, session)
+        await self.notify_changed(server_id)
+        return server
 
     async def delete(
         self,
@@ -47,7 +70,9 @@ class ServerService:
         server = await get_or_404(self.crud, server_id, session)
         log_action_status(
             message=f'Удаление {server.ip_address}')
-        return await self.crud.delete(server, session)
+        server = await self.crud.delete(server, session)
+        await self.notify_changed(server_id)
+        return server
 
 
 server_service = ServerService()
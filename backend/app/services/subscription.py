@@ -1,16 +1,21 @@
 import asyncio
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Sequence
 from urllib.parse import urlparse
 from uuid import uuid4
 
 from fastapi import HTTPException, status
 from faststream.rabbit.fastapi import RabbitRouter
-from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.broker import publish_event, user_changed_exchange
 from app.core.config import settings
-from app.core.variables import SettingServers
+from app.core.database import commit_change, get_session_database
+from app.core.node_client import node_client
+from app.core.variables import SettingBroker, SettingServers
+from app.crud.base import LoadProfile
 from app.crud.user import user_crud
 from app.crud.server import server_crud, certificate_crud
 from app.crud.subscription import subscription_crud, price_crud
@@ -24,6 +29,10 @@ from app.models.subscription import (
 )
 from app.models.user import User
 from app.schemas.payment import PaymentAnswer
+from app.services import placement
+from app.services.health import node_health_monitor
+from app.services.server import server_service
+from app.schemas.user import UserChangedEvent
 from app.schemas.subscription import (
     CertificateCreateDB,
     SubscriptionDB,
@@ -32,6 +41,8 @@ from app.schemas.subscription import (
     SubscriptionRenew,
     SubscriptionUpdate,
     SubscriptionNotifyDB,
+    SubscriptionNotifyDigest,
+    ExpiryJobStatus,
 )
 from app.services.payment import create_payment
 
@@ -46,9 +57,10 @@ class SubscriptionService:
         self,
         tg_id: int,
         session: AsyncSession,
+        profile: LoadProfile = 'menu',
     ) -> tuple[User, Subscription | None]:
         """Проверка наличия пользователя и подписки с возвратом."""
-        user = await user_crud.get_by_tg_id(tg_id, session)
+        user = await user_crud.get_by_tg_id(tg_id, session, profile)
         if user:
             return user, user.subscription
         elif user is None:
@@ -58,35 +70,191 @@ class SubscriptionService:
             )
         return user, None
 
+    @staticmethod
+    async def notify_user_changed(telegram_id: int) -> None:
+        """Сброс кэша профиля пользователя в боте."""
+        await publish_event(
+            UserChangedEvent(telegram_id=telegram_id),
+            user_changed_exchange,
+        )
+
     async def request_certificate(
         self,
         active_server: Server,
         name: str,
     ) -> str:
         """Отправка запроса на генерацию сертификата."""
-        headers = settings.get_headers_auth
-        url = (f'https://{active_server.domain_name}'
-               f'/{SettingServers.API_CERT_HOOK}')
-        json_payload = {'name': name}
-        async with AsyncClient() as client:
-            response = await client.post(
-                url, headers=headers, json=json_payload)
-            if response.status_code != 201:
-                log_action_status(
-                    action_name='Ошибка генерации сертификата',
-                    message=f'Ответ сервера: {response.text} '
-                )
-                raise HTTPException(
-                    status_code=502,
-                    detail=f'Ошибка генерации сертификата: {response.text}'
-                )
-            data = response.json()
+        response = await node_client.request_job(
+            'POST',
+            active_server.domain_name,
+            SettingServers.API_CERT_HOOK,
+            201,
+            json={'name': name},
+        )
+        if response.status_code != 201:
             log_action_status(
-                action_name='Запрос сертификата',
-                message=(f'Сертификат {name} успешно сгенерирован'
-                         f' на сервере {active_server.domain_name}')
+                action_name='Ошибка генерации сертификата',
+                message=f'Ответ сервера: {response.text} '
             )
-            return data.get('download_url')
+            raise HTTPException(
+                status_code=502,
+                detail=f'Ошибка генерации сертификата: {response.text}'
+            )
+        data = response.json()
+        log_action_status(
+            action_name='Запрос сертификата',
+            message=(f'Сертификат {name} успешно сгенерирован'
+                     f' на сервере {active_server.domain_name}')
+        )
+        if data.get('download_url') is None and data.get('certificates'):
+            return data['certificates'][0].get('download_url')
+        return data.get('download_url')
+
+    async def request_certificates(
+        self,
+        active_server: Server,
+        names: list[str],
+    ) -> list[str]:
+        """Выпуск нескольких сертификатов одним запросом к ноде.
+
+        Нода выпускает их за одну блокировку PKI. Если нода еще
+        не поддерживает пакетный выпуск, сертификаты запрашиваются
+        по одному.
+        """
+        if len(names) == 1:
+            return [await self.request_certificate(active_server, names[0])]
+        response = await node_client.request_job(
+            'POST',
+            active_server.domain_name,
+            f'{SettingServers.API_CERT_HOOK}/{SettingServers.API_CERT_BATCH}',
+            201,
+            json={'names': names},
+        )
+        if response.status_code in (404, 405):
+            return await asyncio.gather(*(
+                self.request_certificate(active_server, name)
+                for name in names
+            ))
+        if response.status_code != 201:
+            log_action_status(
+                action_name='Ошибка генерации сертификатов',
+                message=f'Ответ сервера: {response.text} '
+            )
+            raise HTTPException(
+                status_code=502,
+                detail=f'Ошибка генерации сертификатов: {response.text}'
+            )
+        links = {cert.get('name'): cert.get('download_url')
+                 for cert in response.json().get('certificates', [])}
+        if any(links.get(name) is None for name in names):
+            raise HTTPException(
+                status_code=502,
+                detail=f'Нода вернула не все сертификаты: {response.text}'
+            )
+        log_action_status(
+            action_name='Запрос сертификатов',
+            message=(f'Сертификаты {names} успешно сгенерированы'
+                     f' на сервере {active_server.domain_name}')
+        )
+        return [links.get(name) for name in names]
+
+    @staticmethod
+    async def reserve_slots(
+        server: Server,
+        count: int,
+        session: AsyncSession,
+    ) -> bool:
+        """Резервирование мест на сервере до запроса к ноде.
+
+        Резерв сразу фиксируется коммитом и не держит блокировку
+        строки сервера на время выпуска сертификатов. Коммит
+        сохраняет все изменения сессии, поэтому резервировать
+        нужно до того, как подписка или сертификаты изменены.
+        """
+        reserved = await server_crud.reserve(server.id, count, session)
+        if reserved is None:
+            log_action_status(
+                action_name='Резервирование мест',
+                message=(f'На сервере {server.domain_name} '
+                         f'нет {count} свободных мест')
+            )
+            return False
+        return True
+
+    @staticmethod
+    async def release_slots(
+        server: Server,
+        count: int,
+        session: AsyncSession,
+    ) -> None:
+        """Освобождение резерва, если сертификаты не выпущены."""
+        await server_crud.release(server.id, count, session)
+        log_action_status(
+            action_name='Резервирование мест',
+            message=(f'Освобождено {count} мест '
+                     f'на сервере {server.domain_name}')
+        )
+
+    async def issue_certificates(
+        self,
+        server: Server,
+        count: int,
+        session: AsyncSession,
+    ) -> list[str]:
+        """Выпуск сертификатов на зарезервированные места сервера."""
+        try:
+            return await self.request_certificates(
+                server, [uuid4().hex for _ in range(count)])
+        except Exception:
+            await self.release_slots(server, count, session)
+            raise
+
+    async def discard_certificates(
+        self,
+        server: Server,
+        cert_links: list[str],
+        session: AsyncSession,
+    ) -> None:
+        """Откат выпуска, если сертификаты не сохранены в БД.
+
+        Транзакция запроса откатывается, сертификаты отзываются
+        на ноде. Резерв освобождается только за отозванные:
+        оставшиеся на ноде продолжают занимать места.
+        """
+        await session.rollback()
+        # Откат сбрасывает загруженные атрибуты сервера
+        await session.refresh(server)
+        names = [self.parse_cert_link(link)[1] for link in cert_links]
+        statuses = await self.revoke_on_node(server.domain_name, names)
+        revoked = [name for name in names
+                   if statuses.get(name) in ('ok', 'missing')]
+        if len(revoked) < len(names):
+            log_action_status(
+                action_name='Откат выпуска сертификатов',
+                message=(f'Не отозваны на сервере {server.domain_name}: '
+                         f'{sorted(set(names) - set(revoked))}')
+            )
+        if revoked:
+            await self.release_slots(server, len(revoked), session)
+
+    @asynccontextmanager
+    async def keep_issued(
+        self,
+        server: Server,
+        cert_links: list[str],
+        session: AsyncSession,
+    ):
+        """Сохранение выпущенных сертификатов, при ошибке в блоке
+        они отзываются, а резерв освобождается."""
+        try:
+            yield
+        except Exception:
+            try:
+                await self.discard_certificates(server, cert_links, session)
+            except Exception as e:
+                log_action_status(
+                    error=e, action_name='Откат выпуска сертификатов')
+            raise
 
     @staticmethod
     def get_end_date(
@@ -153,21 +321,106 @@ class SubscriptionService:
         session: AsyncSession,
         vless: str | None = None,
     ) -> None:
-        for link in cert_links:
-            cert_data = CertificateCreateDB(
+        """Сохранение выпущенных сертификатов, места уже
+        зарезервированы при выборе сервера."""
+        await certificate_crud.create_many([
+            CertificateCreateDB(
                 filename=link,
                 url_vless=vless,
                 server_id=server.id,
                 subscription_id=subscription.id,
             )
-            await certificate_crud.create(cert_data, session)
+            for link in cert_links
+        ], session, reserved=True)
+        await server_service.notify_changed(server.id)
+
+    @staticmethod
+    def order_servers(servers: Sequence[Server]) -> list[Server]:
+        """Порядок предпочтения серверов по NODE_PROBE_PREFERENCE."""
+        if settings.NODE_PROBE_PREFERENCE == 'load':
+            return sorted(
+                servers,
+                key=lambda s: s.current_cert_count / (s.max_certificates or 1))
+        if settings.NODE_PROBE_PREFERENCE == 'latency':
+            return sorted(
+                servers, key=lambda s: node_client.latency.get(
+                    s.domain_name, 0.0))
+        return list(servers)
+
+    @staticmethod
+    def place_server(servers: Sequence[Server]) -> Server | None:
+        """Выбор сервера стратегией PLACEMENT_STRATEGY."""
+        chosen = placement.choose(
+            [
+                placement.Candidate(
+                    server=server,
+                    load=(server.current_cert_count /
+                          (server.max_certificates or 1)),
+                    latency=node_client.latency.get(server.domain_name),
+                    error_rate=node_client.error_rate.get(
+                        server.domain_name, 0.0),
+                )
+                for server in servers
+            ],
+            settings.PLACEMENT_STRATEGY,
+        )
+        return None if chosen is None else chosen.server
+
+    @staticmethod
+    async def select_healthy_server(servers: list[Server]) -> Server | None:
+        """Одновременная проверка серверов, побеждает первый здоровый.
+
+        Если первым ответил не самый предпочтительный сервер,
+        более предпочтительные ждем не дольше NODE_PROBE_GRACE.
+        Оставшиеся проверки отменяются.
+        """
+        probes = {
+            asyncio.create_task(node_client.probe(
+                server.domain_name, settings.NODE_PROBE_TIMEOUT)): rank
+            for rank, server in enumerate(servers)
+        }
+        pending = set(probes)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.NODE_PROBE_DEADLINE
+        best = None
+        try:
+            while pending:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for probe in done:
+                    rank = probes[probe]
+                    if probe.result() and (best is None or rank < best):
+                        best = rank
+                if best is None:
+                    continue
+                if all(probes[probe] > best for probe in pending):
+                    break
+                deadline = min(
+                    deadline, loop.time() + settings.NODE_PROBE_GRACE)
+        finally:
+            for probe in pending:
+                probe.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return None if best is None else servers[best]
 
     async def check_active_server(
         self,
         protocol: str,
         region_code: str,
         session: AsyncSession,
+        count: int,
     ) -> Server:
+        """Выбор сервера и резервирование на нем count мест.
+
+        Если пока выбирали сервер, его места заняли другие
+        запросы, выбирается следующий из оставшихся.
+        """
         active_servers = await server_crud.get_server_region_and_protocol(
             region_code, protocol, session)
         if active_servers is None:
@@ -181,36 +434,40 @@ class SubscriptionService:
                 detail=(f'Отсутствуют сервера: протокол {protocol} '
                         f'регион {region_code}')
             )
-        active_server = None
-        headers = settings.get_headers_auth
-        for check_server in active_servers:
-            url = (f'https://{check_server.domain_name}'
-                   f'/{SettingServers.API_CHECK_HEALTH}')
-            async with AsyncClient() as client:
-                response = await client.get(url, headers=headers)
-                data = response.json()
-                if response.status_code != 200:
-                    log_action_status(
-                        action_name='Проверка доступности сервера',
-                        message=f'Сервер {check_server.domain_name} недоступен'
-                    )
-                    continue
-                elif data.get('status') == SettingServers.API_OK_HEALTH:
-                    active_server = check_server
-                    break
-        if active_server is None:
-            log_action_status(
-                action_name='Проверка доступности серверов',
-                message=(f'Сервера не отвечают. Протокол: {protocol} '
-                         f'локация: {region_code}')
-            )
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=('Не удалось получить ответа от серверов! '
-                        f'Протокол: {protocol} '
-                        f'локация: {region_code}')
-            )
-        return active_server
+        candidates = list(active_servers)
+        while candidates:
+            if settings.NODE_HEALTH_MONITOR:
+                active_server = self.place_server(
+                    node_health_monitor.healthy_servers(candidates))
+            else:
+                active_server = await self.select_healthy_server(
+                    self.order_servers(candidates))
+            if active_server is None:
+                log_action_status(
+                    action_name='Проверка доступности серверов',
+                    message=(f'Сервера не отвечают. Протокол: {protocol} '
+                             f'локация: {region_code}')
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=('Не удалось получить ответа от серверов! '
+                            f'Протокол: {protocol} '
+                            f'локация: {region_code}')
+                )
+            if await self.reserve_slots(active_server, count, session):
+                return active_server
+            candidates.remove(active_server)
+        log_action_status(
+            action_name='Наличие доступных серверов!',
+            message=(f'Нет свободных мест: протокол {protocol} '
+                     f'регион {region_code}')
+        )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=('Нет свободных мест на серверах! '
+                    f'Протокол: {protocol} '
+                    f'локация: {region_code}')
+        )
 
     async def trial_or_payment(
         self,
@@ -342,48 +599,60 @@ class SubscriptionService:
         type_changed = data_in.type and data_in.type != sub_db.type
 
         if region_changed or protocol_changed:
-            async with AsyncClient() as client:
-                for cert in sub_db.certificates:
-                    await self.delete_certificate(cert, client, session)
+            # Старые сертификаты удаляются после выпуска новых:
+            # без свободных мест подписка остается как была
+            old_certs = list(sub_db.certificates)
             cert_links, active_server = await self.get_server_and_certs(
                 data_in,
                 user,
                 session
             )
-            sub_db.is_active = True
-            sub_db.end_date = self.get_end_date(
-                data_in.duration,
-                sub_db.end_date,
-            )
-            sub_db.region = active_server.region_id
-            sub_db.type = data_in.type
-            session.add(sub_db)
-            await self.create_cert_in_db(
-                active_server,
-                cert_links,
-                sub_db,
-                session,
-            )
+            async with self.keep_issued(active_server, cert_links, session):
+                sub_db.is_active = True
+                sub_db.end_date = self.get_end_date(
+                    data_in.duration,
+                    sub_db.end_date,
+                )
+                sub_db.region_id = active_server.region_id
+                sub_db.type = data_in.type
+                session.add(sub_db)
+                await self.create_cert_in_db(
+                    active_server,
+                    cert_links,
+                    sub_db,
+                    session,
+                )
+            for cert in old_certs:
+                await self.delete_certificate(cert, session)
 
         elif type_changed:
+            device_count = {
+                SubscriptionType.trial: 1,
+                SubscriptionType.devices_2: 2,
+                SubscriptionType.devices_4: 4
+            }
+            old_count = len(sub_db.certificates)
+            new_count = device_count.get(data_in.type, 1)
+            delta = new_count - old_count
             if sub_db.certificates:
                 server = await server_crud.get_by_id(
                     sub_db.certificates[0].server_id,
                     session,
                 )
+                if delta > 0 and not await self.reserve_slots(
+                        server, delta, session):
+                    raise HTTPException(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail=(f'Нет свободных мест на сервере '
+                                f'{server.domain_name}!')
+                    )
             else:
                 server = await self.check_active_server(
                     sub_db.protocol,
                     sub_db.region.code,
                     session,
+                    delta,
                 )
-            device_count = {
-                SubscriptionType.trial: 1,
-                SubscriptionType.devices_2: 2,
-                SubscriptionType.devices_4: 4
-            }
-            old_count = len(sub_db.certificates)
-            new_count = device_count.get(data_in.type, 1)
             sub_db.is_active = True
             sub_db.end_date = self.get_end_date(
                 data_in.duration,
@@ -392,24 +661,19 @@ class SubscriptionService:
             sub_db.type = data_in.type
             session.add(sub_db)
             if new_count > old_count:
-                delta = new_count - old_count
-                cert_names = [uuid4().hex for _ in range(delta)]
-                cert_tasks = [
-                    self.request_certificate(server, name)
-                    for name in cert_names
-                ]
-                cert_links = await asyncio.gather(*cert_tasks)
-                await self.create_cert_in_db(
-                    server,
-                    cert_links,
-                    sub_db,
-                    session,
-                )
+                cert_links = await self.issue_certificates(
+                    server, delta, session)
+                async with self.keep_issued(server, cert_links, session):
+                    await self.create_cert_in_db(
+                        server,
+                        cert_links,
+                        sub_db,
+                        session,
+                    )
             elif new_count < old_count:
                 to_remove = sub_db.certificates[new_count:]
-                async with AsyncClient() as client:
-                    for cert in to_remove:
-                        await self.delete_certificate(cert, client, session)
+                for cert in to_remove:
+                    await self.delete_certificate(cert, session)
         else:
             if not sub_db.certificates:
                 device_count = {
@@ -417,23 +681,22 @@ class SubscriptionService:
                     SubscriptionType.devices_2: 2,
                     SubscriptionType.devices_4: 4
                 }
+                count = device_count.get(sub_db.type, 1)
                 server = await self.check_active_server(
                     sub_db.protocol,
                     sub_db.region.code,
                     session,
+                    count,
                 )
-                cert_names = [uuid4().hex for _ in range(device_count.get(sub_db.type, 1))]
-                cert_tasks = [
-                    self.request_certificate(server, name)
-                    for name in cert_names
-                ]
-                cert_links = await asyncio.gather(*cert_tasks)
-                await self.create_cert_in_db(
-                    server,
-                    cert_links,
-                    sub_db,
-                    session,
-                )
+                cert_links = await self.issue_certificates(
+                    server, count, session)
+                async with self.keep_issued(server, cert_links, session):
+                    await self.create_cert_in_db(
+                        server,
+                        cert_links,
+                        sub_db,
+                        session,
+                    )
             sub_db.is_active = True
             sub_db.end_date = self.get_end_date(
                 data_in.duration,
@@ -441,6 +704,7 @@ class SubscriptionService:
             )
             session.add(sub_db)
         await session.commit()
+        await self.notify_user_changed(user.telegram_id)
 
     async def renewal_sub(
         self,
@@ -464,27 +728,27 @@ class SubscriptionService:
                 SubscriptionType.devices_2: 2,
                 SubscriptionType.devices_4: 4
             }
+            count = device_count.get(sub_db.type, 1)
             server = await self.check_active_server(
                 sub_db.protocol,
                 sub_db.region.code,
                 session,
+                count,
             )
-            cert_names = [uuid4().hex for _ in range(device_count.get(sub_db.type, 1))]
-            cert_tasks = [
-                self.request_certificate(server, name)
-                for name in cert_names
-            ]
-            cert_links = await asyncio.gather(*cert_tasks)
-            await self.create_cert_in_db(
-                server,
-                cert_links,
-                sub_db,
-                session,
-            )
+            cert_links = await self.issue_certificates(
+                server, count, session)
+            async with self.keep_issued(server, cert_links, session):
+                await self.create_cert_in_db(
+                    server,
+                    cert_links,
+                    sub_db,
+                    session,
+                )
         sub_db.is_active = True
         sub_db.end_date = self.get_end_date(data_in.duration, sub_db.end_date)
         session.add(sub_db)
         await session.commit()
+        await self.notify_user_changed(data_in.tg_id)
 
     async def get_server_and_certs(
         self,
@@ -492,27 +756,24 @@ class SubscriptionService:
         user: User,
         session: AsyncSession,
     ) -> tuple[list[str], Server]:
-        active_server = await self.check_active_server(
-            data_in.protocol,
-            data_in.region_code,
-            session,
-        )
         device_count = {
             SubscriptionType.trial: 1,
             SubscriptionType.devices_2: 2,
             SubscriptionType.devices_4: 4
         }.get(data_in.type, 1)
-        cert_names = [uuid4().hex for _ in range(device_count)]
+        active_server = await self.check_active_server(
+            data_in.protocol,
+            data_in.region_code,
+            session,
+            device_count,
+        )
         log_action_status(
             action_name='Запрос подписки',
             message=(f'Генерация {device_count} сертификатов '
                      f'для пользователя {user.telegram_id}')
         )
-        cert_tasks = [
-            self.request_certificate(active_server, name)
-            for name in cert_names
-        ]
-        cert_links = await asyncio.gather(*cert_tasks)
+        cert_links = await self.issue_certificates(
+            active_server, device_count, session)
         return cert_links, active_server
 
     async def process_create(
@@ -527,14 +788,15 @@ class SubscriptionService:
             session,
         )
         try:
-            subscription = await self.create_subscription(
-                server=active_server,
-                user=user,
-                cert_links=cert_links,
-                session=session,
-                subscription_type=data_in.type,
-                subscription_duration=data_in.duration,
-            )
+            async with self.keep_issued(active_server, cert_links, session):
+                subscription = await self.create_subscription(
+                    server=active_server,
+                    user=user,
+                    cert_links=cert_links,
+                    session=session,
+                    subscription_type=data_in.type,
+                    subscription_duration=data_in.duration,
+                )
 
         except Exception as e:
             log_action_status(
@@ -542,6 +804,7 @@ class SubscriptionService:
                 action_name='Ошибка создания подписки'
             )
             raise
+        await self.notify_user_changed(user.telegram_id)
         subs_answer = SubscriptionDB(
             is_active=subscription.is_active,
             id=subscription.id,
@@ -581,75 +844,153 @@ class SubscriptionService:
 
     async def notify_about_subs(
         self,
-        session: AsyncSession,
         router: RabbitRouter,
+        job: ExpiryJobStatus,
+        save_progress: Callable[[ExpiryJobStatus], Awaitable[None]]
+        | None = None,
     ) -> None:
-        expired_subs = await subscription_crud.get_expired_subs(
-            session,
-        )
-        expiring_subs = await subscription_crud.get_expiring_subs(
-            session,
-        )
-        for sub in expired_subs:
-            try:
-                sub.is_active = False
-                session.add(sub)
-                await self.revoke_certificate(sub, session)
-                log_action_status(
-                    action_name='Деактивация подписки',
-                    message=(f'Подписка ID={sub.id} пользователя {sub.user_id}'
-                             ' деактивирована и сертификаты удалены.')
-                )
-            except Exception as e:
-                log_action_status(
-                    action_name='Ошибка при деактивации',
-                    error=e,
-                    message=f'Не удалось обработать подписку ID={sub.id}'
+        """Отключение истекших подписок и уведомление пользователей.
+
+        Пользователи обрабатываются порциями по EXPIRY_BATCH_SIZE
+        с пагинацией по user_id: все подписки пользователя попадают
+        в одну порцию и одно уведомление, в памяти только текущая.
+        Каждая порция работает в своей сессии, прогресс пишется в job
+        и после каждой порции передается в save_progress.
+        """
+        async with get_session_database() as session:
+            job.total = job.remaining = (
+                await subscription_crud.count_expired_subs(session))
+        after_user_id = 0
+        while True:
+            async with get_session_database() as session:
+                user_ids = await subscription_crud.get_notify_user_ids(
+                    after_user_id,
+                    settings.EXPIRY_BATCH_SIZE,
+                    max(settings.REMINDER_HORIZONS, default=-1),
+                    session,
                 )
-            else:
+                if not user_ids:
+                    break
+                after_user_id = user_ids[-1]
+                digests, processed, failed = await self.process_expiry_chunk(
+                    user_ids[0], user_ids[-1], session)
+            job.processed += processed
+            job.failed += failed
+            job.remaining = max(job.total - job.processed - job.failed, 0)
+            for digest in digests:
                 log_action_status(
                     action_name='Создание задачи',
-                    message=(f'Уведомление {sub.user.telegram_id} '
-                             'об отключении подписки ID={sub.id}.')
+                    message=(f'Уведомление {digest.telegram_id}: '
+                             f'отключено {len(digest.expired)}, '
+                             f'заканчивается {len(digest.expiring)}.')
                 )
                 await router.broker.publish(
-                    message=SubscriptionNotifyDB(
-                        type=sub.type,
-                        region=sub.region.name,
-                        protocol=sub.protocol,
-                        telegram_id=sub.user.telegram_id),
-                    queue='notify_deactivate_sub',
+                    message=digest,
+                    queue=SettingBroker.QUEUE_SUBS_DIGEST,
                 )
-        for sub in expiring_subs:
-            log_action_status(
-                action_name='Создание задачи',
-                message=(f'Уведомление {sub.user.telegram_id} '
-                         'об окончании подписки ID={sub.id}.')
-            )
-            await router.broker.publish(
-                message=SubscriptionNotifyDB(
-                    type=sub.type,
-                    region=sub.region.name,
-                    protocol=sub.protocol,
-                    telegram_id=sub.user.telegram_id),
-                queue='notify_end_sub',
-            )
-        await session.commit()
+                job.notified += 1
+            if save_progress is not None:
+                await save_progress(job)
         return None
 
-    async def delete_certificate(
+    async def process_expiry_chunk(
         self,
-        cert: Certificate,
-        http_client: AsyncClient,
+        first_user_id: int,
+        last_user_id: int,
         session: AsyncSession,
-    ) -> None:
-        headers = settings.get_headers_auth
-        parsed = urlparse(cert.filename)
-        domain = parsed.netloc
-        filename = os.path.basename(parsed.path)
-        cert_name, _ = os.path.splitext(filename)
-        url = f'https://{domain}/{SettingServers.API_CERT_HOOK}/{cert_name}'
-        response = await http_client.delete(url, headers=headers)
+    ) -> tuple[list[SubscriptionNotifyDigest], int, int]:
+        """Отключение подписок пользователей из диапазона.
+
+        Подписки, сертификаты которых отозвать не удалось, снова
+        включаются и обрабатываются при следующем запуске.
+        Напоминания об окончании отмечаются отдельным коммитом
+        до отзыва, чтобы откат порции не повторил их.
+        Возвращает уведомления, число отключенных и число ошибок.
+        """
+        today = datetime.now(timezone.utc).date()
+        digests: dict[int, SubscriptionNotifyDigest] = {}
+
+        def digest_for(telegram_id: int) -> SubscriptionNotifyDigest:
+            if telegram_id not in digests:
+                digests[telegram_id] = SubscriptionNotifyDigest(
+                    telegram_id=telegram_id)
+            return digests[telegram_id]
+
+        def notify_entry(sub: Subscription) -> SubscriptionNotifyDB:
+            return SubscriptionNotifyDB(
+                type=sub.type,
+                region=sub.region.name,
+                protocol=sub.protocol,
+            )
+
+        for sub in await subscription_crud.claim_expiring_subs(
+            first_user_id,
+            last_user_id,
+            settings.REMINDER_HORIZONS,
+            session,
+        ):
+            entry = notify_entry(sub)
+            entry.days_left = (sub.end_date.date() - today).days
+            digest_for(sub.user.telegram_id).expiring.append(entry)
+        await commit_change(session)
+        expired_subs = await subscription_crud.claim_expired_subs(
+            first_user_id, last_user_id, session,
+        )
+        # Данные для уведомлений до отзыва: откат сбрасывает объекты
+        expired_entries = [
+            (sub.id, sub.user.telegram_id, sub.user_id, notify_entry(sub))
+            for sub in expired_subs
+        ]
+        try:
+            failed = await self.revoke_subscriptions(
+                expired_subs, session, deactivate=True)
+        except Exception as e:
+            log_action_status(
+                action_name='Ошибка при деактивации',
+                error=e,
+                message=(f'Подписки пользователей {first_user_id}-'
+                         f'{last_user_id} не обработаны')
+            )
+            await session.rollback()
+            failed = {sub_id for sub_id, *_ in expired_entries}
+        for sub_id, telegram_id, user_id, entry in expired_entries:
+            if sub_id in failed:
+                log_action_status(
+                    action_name='Ошибка при деактивации',
+                    message=(f'Не удалось отозвать сертификаты '
+                             f'подписки ID={sub_id}, повтор '
+                             f'при следующем запуске')
+                )
+                continue
+            log_action_status(
+                action_name='Деактивация подписки',
+                message=(f'Подписка ID={sub_id} пользователя {user_id}'
+                         ' деактивирована и сертификаты удалены.')
+            )
+            digest_for(telegram_id).expired.append(entry)
+        return (list(digests.values()),
+                len(expired_entries) - len(failed), len(failed))
+
+    @staticmethod
+    def parse_cert_link(link: str) -> tuple[str, str]:
+        """Домен ноды и имя сертификата из ссылки на файл."""
+        parsed = urlparse(link)
+        cert_name, _ = os.path.splitext(os.path.basename(parsed.path))
+        return parsed.netloc, cert_name
+
+    def parse_cert_filename(self, cert: Certificate) -> tuple[str, str]:
+        return self.parse_cert_link(cert.filename)
+
+    @staticmethod
+    async def delete_on_node(domain: str, cert_name: str) -> bool:
+        """Отзыв одного сертификата на ноде, без изменений в БД."""
+        async with node_client.limit(domain):
+            response = await node_client.request_job(
+                'DELETE',
+                domain,
+                f'{SettingServers.API_CERT_HOOK}/{cert_name}',
+                200,
+            )
         if response.status_code != 200:
             log_action_status(
                 action_name='Ошибка удаления сертификата',
@@ -657,6 +998,16 @@ class SubscriptionService:
                          f' {domain}. Код ответа: {response.status_code}, '
                          f'тело: {response.text}')
             )
+            return False
+        return True
+
+    async def delete_certificate(
+        self,
+        cert: Certificate,
+        session: AsyncSession,
+    ) -> None:
+        domain, cert_name = self.parse_cert_filename(cert)
+        if not await self.delete_on_node(domain, cert_name):
             raise HTTPException(
                 status_code=502,
                 detail=f'Ошибка при удалении сертификата {cert_name}'
@@ -667,25 +1018,114 @@ class SubscriptionService:
                         f' на сервере {domain}')
         )
         await certificate_crud.delete(cert, session)
+        await server_service.notify_changed(cert.server_id)
 
-    async def revoke_certificate(
+    async def revoke_on_node(
         self,
-        subscription: Subscription,
+        domain: str,
+        cert_names: list[str],
+    ) -> dict[str, str]:
+        """Пакетный отзыв на одной ноде, статус по каждому имени.
+
+        Пакеты к ноде идут не больше node_client.limit(domain)
+        одновременно. Если нода не поддерживает пакетный отзыв,
+        сертификаты отзываются по одному.
+        """
+        async def revoke_chunk(names: list[str]) -> dict[str, str]:
+            async with node_client.limit(domain):
+                response = await node_client.request_job(
+                    'POST',
+                    domain,
+                    f'{SettingServers.API_CERT_HOOK}/'
+                    f'{SettingServers.API_CERT_REVOKE}',
+                    200,
+                    json={'names': names},
+                )
+            if response.status_code in (404, 405):
+                deleted = await asyncio.gather(*(
+                    self.delete_on_node(domain, name) for name in names
+                ), return_exceptions=True)
+                return {name: 'ok' for name, ok in zip(names, deleted)
+                        if ok is True}
+            if response.status_code != 200:
+                log_action_status(
+                    action_name='Ошибка удаления сертификатов',
+                    message=(f'Сервер {domain} не отозвал сертификаты. '
+                             f'Код ответа: {response.status_code}, '
+                             f'тело: {response.text}')
+                )
+                return {}
+            return {result.get('name'): result.get('status')
+                    for result in response.json().get('results', [])}
+
+        batch_size = settings.NODE_REVOKE_BATCH_SIZE
+        results = await asyncio.gather(*(
+            revoke_chunk(cert_names[start:start + batch_size])
+            for start in range(0, len(cert_names), batch_size)
+        ), return_exceptions=True)
+        statuses = {}
+        for result in results:
+            if isinstance(result, Exception):
+                log_action_status(
+                    action_name='Ошибка удаления сертификатов',
+                    error=result,
+                    message=f'Сервер {domain} недоступен'
+                )
+                continue
+            statuses.update(result)
+        return statuses
+
+    async def revoke_subscriptions(
+        self,
+        subscriptions: Sequence[Subscription],
         session: AsyncSession,
-    ) -> None:
-        if subscription.is_active:
-            raise HTTPException(
-                status_code=403,
-                detail='Нельзя удалить сертификаты у активной подписки!'
+        deactivate: bool = False,
+    ) -> set[int]:
+        """Отзыв сертификатов подписок пакетами по нодам.
+
+        Ноды обрабатываются параллельно, на каждой CRL пересобирается
+        один раз, изменения в БД сохраняются одним коммитом. Сбой
+        затрагивает только подписки с неотозванными сертификатами,
+        их id возвращаются. С deactivate остальные подписки
+        отключаются в том же коммите, а подписки со сбоем остаются
+        активными.
+        """
+        by_domain: dict[str, dict[str, Certificate]] = {}
+        for subscription in subscriptions:
+            for cert in subscription.certificates:
+                domain, cert_name = self.parse_cert_filename(cert)
+                by_domain.setdefault(domain, {})[cert_name] = cert
+        domains = list(by_domain)
+        results = await asyncio.gather(*(
+            self.revoke_on_node(domain, list(by_domain[domain]))
+            for domain in domains
+        ))
+
+        failed = set()
+        revoked = []
+        for domain, statuses in zip(domains, results):
+            certs = by_domain[domain]
+            count = len(revoked)
+            for cert_name, cert in certs.items():
+                # missing - сертификат уже отозван ранее
+                if statuses.get(cert_name) in ('ok', 'missing'):
+                    revoked.append(cert)
+                else:
+                    failed.add(cert.subscription_id)
+            log_action_status(
+                action_name='Удаление сертификатов',
+                message=(f'На сервере {domain} отозвано '
+                         f'{len(revoked) - count} из {len(certs)} '
+                         f'сертификатов')
             )
-        certificates = subscription.certificates
-        async with AsyncClient() as client:
-            for cert in certificates:
-                await self.delete_certificate(cert, client, session)
-        log_action_status(
-            action_name='Удаление сертификатов',
-            message=f'Удалены сертификаты по подписке {subscription.id} '
-        )
+        if deactivate:
+            for subscription in subscriptions:
+                subscription.is_active = subscription.id in failed
+                session.add(subscription)
+        await certificate_crud.delete_many(revoked, session)
+        for server_id in {cert.server_id for cert in revoked}:
+            await server_service.notify_changed(server_id)
+        return failed
 
     async def get_sub_with_cert(
         self,
@@ -695,6 +1135,7 @@ class SubscriptionService:
         user, subscriptions = await self.check_user_and_subscription(
             tg_id,
             session,
+            profile='billing',
         )
         if subscriptions is None:
             raise HTTPException(
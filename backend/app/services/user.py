@@ -1,4 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.crud.user import user_crud
 from app.core.log_config import log_action_status, log_db_action
@@ -12,32 +13,23 @@ class UserService:
     model = User
     crud = user_crud
 
-    async def check_refer(
-        self,
-        refer_id: int,
-        session: AsyncSession
-    ) -> int | None:
-        refer_user = await self.crud.get_by_tg_id(refer_id, session)
-        if refer_user:
-            return refer_user.id
-        else:
-            log_action_status(
-                message=f'Предоставлен недействительный refer: {refer_id}')
-            return None
-
     @log_db_action('Авторизация пользователя')
     async def get_or_create(
         self,
         user: UserCreate,
         session: AsyncSession
     ) -> User:
-        user_from_db = await self.crud.get_by_tg_id(user.telegram_id, session)
+        user_from_db = await self.crud.get_by_tg_id(
+            user.telegram_id, session, profile='menu')
         if user_from_db:
             return user_from_db
-        if user.refer_from_id:
-            user.refer_from_id = await self.check_refer(
-                user.refer_from_id, session)
-        new_user = await self.crud.create(user, session)
+        new_user = await self.crud.get_or_create(user, session)
+        if user.refer_from_id and new_user.refer_from_id is None:
+            log_action_status(
+                message=('Предоставлен недействительный refer: '
+                         f'{user.refer_from_id}'))
+        # Только что созданный пользователь еще без подписок
+        set_committed_value(new_user, 'subscription', [])
         return new_user
 
 
@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 
 from alembic import command
 from alembic.config import Config
@@ -9,12 +10,35 @@ from starlette.types import ASGIApp
 
 from app.api.routers import main_router
 from app.core.config import settings
-from app.core.log_config import app_logger
+from app.core.database import get_session_database
+from app.core.log_config import app_logger, log_action_status
+from app.core.node_client import node_client
+from app.crud.server import server_crud
+from app.services.expiry import expiry_job_runner
+from app.services.health import node_health_monitor
 from app.middlewares.ip_access import IPWhitelistMiddleware
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Пул соединений и мониторинг нод на время жизни приложения."""
+    try:
+        async with get_session_database() as session:
+            servers = await server_crud.get_active_servers(session)
+        await node_client.warm_up(server.domain_name for server in servers)
+    except Exception as e:
+        log_action_status(error=e, action_name='Прогрев соединений к нодам')
+    if settings.NODE_HEALTH_MONITOR:
+        node_health_monitor.start()
+    yield
+    await expiry_job_runner.stop()
+    await node_health_monitor.stop()
+    await node_client.close()
+
+
 app = FastAPI(title=settings.APP_TITLE,
               description=settings.APP_DESCRIPTION,
+              lifespan=lifespan,
               )
 
 app.add_middleware(IPWhitelistMiddleware)
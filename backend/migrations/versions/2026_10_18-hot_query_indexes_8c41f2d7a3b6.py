@@ -0,0 +1,56 @@
+"""Hot query indexes
+
+Revision ID: 8c41f2d7a3b6
+Revises: 5b7d2a1c9e40
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41f2d7a3b6'
+down_revision: Union[str, None] = '5b7d2a1c9e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# referralbonus(user_id) покрыт уникальным индексом uq_user_invited
+INDEXES = (
+    ('ix_subscription_end_date_active', 'subscription', ['end_date'],
+     sa.text('is_active')),
+    ('ix_subscription_user_id', 'subscription', ['user_id'], None),
+    ('ix_certificate_subscription_id', 'certificate',
+     ['subscription_id'], None),
+    ('ix_certificate_server_id', 'certificate', ['server_id'], None),
+    ('ix_payment_user_id_status', 'payment', ['user_id', 'status'], None),
+    ('ix_referralbonus_invited_id', 'referralbonus', ['invited_id'], None),
+    ('ix_server_region_id_protocol_active', 'server',
+     ['region_id', 'protocol'], sa.text('is_active')),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Без блокировки записи в таблицы на время построения
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_where=where,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,32 @@
+"""Server health
+
+Revision ID: 5b7d2a1c9e40
+Revises: 3c9e02eca479
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7d2a1c9e40'
+down_revision: Union[str, None] = '3c9e02eca479'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('server', sa.Column('is_healthy', sa.Boolean(), server_default=sa.true(), nullable=False))
+    op.add_column('server', sa.Column('latency_ms', sa.Integer(), nullable=True))
+    op.add_column('server', sa.Column('health_checked_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('server', 'health_checked_at')
+    op.drop_column('server', 'latency_ms')
+    op.drop_column('server', 'is_healthy')
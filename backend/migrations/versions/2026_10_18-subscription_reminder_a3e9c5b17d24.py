@@ -0,0 +1,38 @@
+"""Subscription reminder
+
+Revision ID: a3e9c5b17d24
+Revises: 8c41f2d7a3b6
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e9c5b17d24'
+down_revision: Union[str, None] = '8c41f2d7a3b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('subscriptionreminder',
+    sa.Column('subscription_id', sa.BigInteger(), nullable=False),
+    sa.Column('end_date', sa.DateTime(), nullable=False),
+    sa.Column('horizon', sa.Integer(), nullable=False),
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['subscription_id'], ['subscription.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('subscription_id', 'end_date', 'horizon', name='uq_subscription_reminder')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('subscriptionreminder')
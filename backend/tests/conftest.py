@@ -0,0 +1,92 @@
+"""Фикстуры тестов с PostgreSQL.
+
+Тесты работают с отдельной базой из TEST_DATABASE_URL
+(postgresql+asyncpg://...), схема пересоздается миграциями
+alembic в начале запуска. Без переменной тесты с БД пропускаются.
+"""
+import asyncio
+import os
+
+import pytest
+
+# Настройки приложения обязательны при импорте, тестам нужна только БД
+for name, value in {
+    'API_KEY': 'test', 'BACKEND_HOST': 'localhost', 'BACKEND_PORT': '8000',
+    'DB_HOST': 'localhost', 'DB_PORT': '5432', 'POSTGRES_DB': 'test',
+    'POSTGRES_USER': 'test', 'POSTGRES_PASSWORD': 'test',
+    'SHOP_ID': 'test', 'SECRET_KEY_SHOP': 'test',
+    'REDIS_PASSWORD': 'test', 'REDIS_USER': 'test',
+    'REDIS_USER_PASSWORD': 'test', 'REDIS_HOST': 'localhost',
+    'REDIS_PORT': '6379', 'REDIS_DB': '0',
+    'RABBITMQ_DEFAULT_USER': 'test', 'RABBITMQ_DEFAULT_PASS': 'test',
+    'RABBIT_HOST': 'localhost', 'RABBIT_PORT_WEB': '15672',
+    'RABBIT_PORT_AMQP': '5672', 'ALLOWED_IP_YOOKASSA': '["127.0.0.1"]',
+}.items():
+    os.environ.setdefault(name, value)
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+import app.core.base  # noqa: E402,F401 - все модели для настройки связей
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def upgrade_schema(connection) -> None:
+    config = Config(os.path.join(BACKEND_DIR, 'alembic.ini'))
+    config.set_main_option(
+        'script_location', os.path.join(BACKEND_DIR, 'migrations'))
+    config.attributes['connection'] = connection
+    command.upgrade(config, 'head')
+
+
+async def recreate_schema() -> None:
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    async with engine.connect() as connection:
+        await connection.execute(text('DROP SCHEMA public CASCADE'))
+        await connection.execute(text('CREATE SCHEMA public'))
+        await connection.commit()
+        await connection.run_sync(upgrade_schema)
+        await connection.commit()
+    await engine.dispose()
+
+
+@pytest.fixture(scope='session')
+def database_url() -> str:
+    if not TEST_DATABASE_URL:
+        pytest.skip('TEST_DATABASE_URL не задан')
+    asyncio.run(recreate_schema())
+    return TEST_DATABASE_URL
+
+
+async def truncate_tables(engine) -> None:
+    """Очистка всех таблиц кроме версии миграций."""
+    async with engine.begin() as connection:
+        tables = (await connection.execute(text(
+            "SELECT tablename FROM pg_tables WHERE schemaname = 'public' "
+            "AND tablename != 'alembic_version'"
+        ))).scalars().all()
+        await connection.execute(text(
+            'TRUNCATE ' + ', '.join(f'"{table}"' for table in tables)
+            + ' RESTART IDENTITY CASCADE'))
+
+
+@pytest.fixture
+async def engine(database_url):
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    yield engine
+    await truncate_tables(engine)
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_maker(engine) -> async_sessionmaker:
+    return async_sessionmaker(
+        engine, expire_on_commit=False, autoflush=False)
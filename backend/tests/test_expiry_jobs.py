@@ -0,0 +1,83 @@
+"""Запуск задачи отключения подписок из нескольких воркеров."""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services import expiry
+from app.services.expiry import ExpiryJobRunner
+from app.services.subscription import subscription_service
+
+
+@pytest.fixture
+def release(engine, session_maker, monkeypatch):
+    """Задача выполняется, пока не установлено событие."""
+    release = asyncio.Event()
+
+    @asynccontextmanager
+    async def get_session_database():
+        async with session_maker() as session:
+            yield session
+
+    async def notify_about_subs(router, job, save_progress=None):
+        job.total = job.remaining = 2
+        job.processed, job.remaining = 1, 1
+        await save_progress(job)
+        await release.wait()
+        job.processed, job.remaining = 2, 0
+
+    monkeypatch.setattr(expiry, 'engine', engine)
+    monkeypatch.setattr(expiry, 'get_session_database', get_session_database)
+    monkeypatch.setattr(
+        subscription_service, 'notify_about_subs', notify_about_subs)
+    return release
+
+
+async def wait_status(runner, session_maker, job_id, status):
+    for _ in range(100):
+        async with session_maker() as session:
+            job = await runner.get(job_id, session)
+        if job.status == status:
+            return job
+        await asyncio.sleep(0.05)
+    raise AssertionError(f'Задача {job_id} не перешла в {status}')
+
+
+async def test_single_job_across_workers(release, session_maker):
+    first, second = ExpiryJobRunner(keep=5), ExpiryJobRunner(keep=5)
+
+    job = await first.start(router=None)
+    running = await second.start(router=None)
+    assert running.job_id == job.job_id
+
+    progress = await wait_status(second, session_maker, job.job_id, 'running')
+    assert (progress.processed, progress.remaining) == (1, 1)
+
+    release.set()
+    done = await wait_status(second, session_maker, job.job_id, 'done')
+    assert (done.processed, done.remaining) == (2, 0)
+    assert done.finished_at is not None
+
+    # Блокировка снята: следующий запуск создает новую задачу
+    again = await second.start(router=None)
+    assert again.job_id != job.job_id
+    await wait_status(first, session_maker, again.job_id, 'done')
+
+
+async def test_unfinished_job_marked_failed(release, session_maker):
+    crashed, runner = ExpiryJobRunner(keep=5), ExpiryJobRunner(keep=5)
+    job = await crashed.start(router=None)
+    # Процесс упал: задача осталась running, соединение закрыто
+    await crashed.stop()
+    async with session_maker() as session:
+        await session.execute(
+            expiry.expiry_job_crud.model.__table__.update()
+            .values(status='running', error=None))
+        await session.commit()
+
+    release.set()
+    new = await runner.start(router=None)
+    assert new.job_id != job.job_id
+    failed = await wait_status(runner, session_maker, job.job_id, 'failed')
+    assert failed.error == 'Задача прервана'
+    await wait_status(runner, session_maker, new.job_id, 'done')
@@ -0,0 +1,57 @@
+"""Запись результатов проверки нод одним пакетом."""
+from sqlalchemy import event, select
+
+from app.core.node_client import node_client
+from app.models.server import Region, Server, VPNProtocol
+from app.services.health import NodeHealthMonitor
+from app.services.server import server_service
+
+DOMAINS = ('nl1.example.com', 'nl2.example.com', 'nl3.example.com')
+
+
+async def test_check_writes_all_servers_at_once(
+        engine, session_maker, monkeypatch):
+    async with session_maker() as session:
+        region = Region(code='nl', name='Нидерланды')
+        session.add_all(Server(
+            ip_address=f'10.0.0.{number}',
+            domain_name=domain,
+            protocol=VPNProtocol.openvpn,
+            is_active=True,
+            max_certificates=10,
+            region=region,
+        ) for number, domain in enumerate(DOMAINS, start=1))
+        await session.commit()
+
+    async def probe(domain, timeout):
+        return domain != DOMAINS[-1]
+
+    async def notify_changed(server_id=None):
+        pass
+
+    monkeypatch.setattr(node_client, 'probe', probe)
+    monkeypatch.setattr(server_service, 'notify_changed', notify_changed)
+    monkeypatch.setattr(node_client, 'latency', dict.fromkeys(DOMAINS, 0.05))
+    updates = []
+
+    def count_updates(conn, cursor, statement, parameters, context,
+                      executemany):
+        if statement.startswith('UPDATE'):
+            updates.append(executemany)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', count_updates)
+    monitor = NodeHealthMonitor(
+        interval=60, timeout=1, rise_threshold=1, fall_threshold=1)
+    async with session_maker() as session:
+        await monitor.check(session)
+    event.remove(engine.sync_engine, 'before_cursor_execute', count_updates)
+
+    assert updates == [True]
+    async with session_maker() as session:
+        servers = {
+            server.domain_name: server
+            for server in (await session.scalars(select(Server))).all()}
+    assert [servers[domain].latency_ms for domain in DOMAINS] == [50, 50, None]
+    assert [servers[domain].is_healthy for domain in DOMAINS] == [
+        True, True, False]
+    assert all(server.health_checked_at for server in servers.values())
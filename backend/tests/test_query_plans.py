@@ -0,0 +1,240 @@
+"""Планы горячих запросов используют индексы миграции 8c41f2d7a3b6.
+
+База заполняется данными с распределением как в работе бота,
+после ANALYZE для запросов из CRUD выполняется EXPLAIN и
+проверяется, что в плане есть сканирование нужного индекса.
+Если запрос перестанет подходить под индекс (функция над колонкой,
+другое условие), тест упадет.
+"""
+import asyncio
+import contextlib
+import json
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.crud.payment import payment_crud, referral_crud
+from app.crud.server import server_crud
+from app.crud.subscription import subscription_crud
+from app.crud.user import user_crud
+from tests.conftest import truncate_tables
+
+USERS = 100_000
+REGIONS = 50
+SERVERS = 5_000
+
+SEED = (
+    f"""
+    INSERT INTO region (code, name)
+    SELECT chr(97 + g / 26) || chr(97 + g % 26), 'Регион ' || g
+    FROM generate_series(1, {REGIONS}) g
+    """,
+    f"""
+    INSERT INTO server (ip_address, domain_name, protocol, is_active,
+                        max_certificates, current_cert_count, region_id)
+    SELECT '10.' || (g / 65536) || '.' || (g / 256 % 256) || '.' || g % 256,
+           'node' || g || '.example.com',
+           (CASE WHEN g % 2 = 0 THEN 'openvpn' ELSE 'vless' END)::vpnprotocol,
+           g % 10 != 0, 1000, 0, 1 + g % {REGIONS}
+    FROM generate_series(1, {SERVERS}) g
+    """,
+    f"""
+    INSERT INTO "user" (telegram_id, ref_count)
+    SELECT 1000000 + g, 0 FROM generate_series(1, {USERS}) g
+    """,
+    # Подписки на год вперед, небольшая доля истекла или истекает
+    f"""
+    INSERT INTO subscription (type, protocol, end_date, is_active,
+                              region_id, user_id)
+    SELECT 'devices_2', 'openvpn',
+           now() + ((g % 730) - 30) * interval '1 day' - interval '1 day',
+           g % 730 >= 30 OR g % 3 = 0, 1 + g % {REGIONS}, g
+    FROM generate_series(1, {USERS}) g
+    """,
+    f"""
+    INSERT INTO certificate (filename, server_id, subscription_id)
+    SELECT 'https://node/d/c' || g || '.ovpn', 1 + g % {SERVERS},
+           (g + 1) / 2
+    FROM generate_series(1, {USERS * 2}) g
+    """,
+    f"""
+    INSERT INTO payment (amount, provider, status, operation_id, user_id)
+    SELECT 100, 'yookassa',
+           (ARRAY['success', 'pending', 'failed'])[1 + g % 3]::paymentstatus,
+           'op' || g, 1 + g % {USERS}
+    FROM generate_series(1, {USERS * 2}) g
+    """,
+    f"""
+    INSERT INTO referralbonus (bonus_given, bonus_size, invited_id, user_id)
+    SELECT false, 50, {USERS // 2} + g, g
+    FROM generate_series(1, {USERS // 5}) g
+    """,
+    'ANALYZE',
+)
+
+
+async def seed(database_url) -> None:
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    async with engine.begin() as connection:
+        for statement in SEED:
+            await connection.execute(text(statement))
+    await engine.dispose()
+
+
+async def clear(database_url) -> None:
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    await truncate_tables(engine)
+    await engine.dispose()
+
+
+@pytest.fixture(scope='module')
+def seeded_url(database_url):
+    """Данные заполняются один раз на модуль, запросы их не меняют."""
+    asyncio.run(seed(database_url))
+    yield database_url
+    asyncio.run(clear(database_url))
+
+
+@pytest.fixture
+async def seeded(seeded_url):
+    engine = create_async_engine(seeded_url, poolclass=NullPool)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_maker(seeded) -> async_sessionmaker:
+    return async_sessionmaker(
+        seeded, expire_on_commit=False, autoflush=False)
+
+
+@contextlib.contextmanager
+def capture_statements(engine):
+    """SQL и параметры всех запросов, отправленных в БД."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters,
+                              context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(
+        engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute',
+                     before_cursor_execute)
+
+
+def plan_indexes(node: dict) -> set[str]:
+    """Индексы из всех узлов плана."""
+    indexes = {node['Index Name']} if 'Index Name' in node else set()
+    for child in node.get('Plans', ()):
+        indexes |= plan_indexes(child)
+    return indexes
+
+
+async def explain_indexes(engine, statements) -> list[set[str]]:
+    """Индексы из плана каждого запроса, без их выполнения."""
+    plans = []
+    async with engine.connect() as connection:
+        for statement, parameters in statements:
+            result = await connection.exec_driver_sql(
+                f'EXPLAIN (FORMAT JSON) {statement}', parameters)
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            plans.append(plan_indexes(plan[0]['Plan']))
+    return plans
+
+
+async def run_query(seeded, session_maker, query) -> list[set[str]]:
+    """Выполнение запроса CRUD с откатом и планы его запросов."""
+    with capture_statements(seeded) as statements:
+        async with session_maker() as session:
+            await query(session)
+            await session.rollback()
+    return await explain_indexes(seeded, statements)
+
+
+async def test_count_expired_uses_end_date_index(seeded, session_maker):
+    [plan] = await run_query(
+        seeded, session_maker, subscription_crud.count_expired_subs)
+
+    assert 'ix_subscription_end_date_active' in plan
+
+
+async def test_notify_user_ids_use_subscription_indexes(
+        seeded, session_maker):
+    [plan] = await run_query(
+        seeded, session_maker,
+        lambda session: subscription_crud.get_notify_user_ids(
+            0, settings.EXPIRY_BATCH_SIZE,
+            max(settings.REMINDER_HORIZONS), session))
+
+    assert plan & {'ix_subscription_end_date_active',
+                   'ix_subscription_user_id'}
+
+
+async def test_claim_expired_uses_indexes(seeded, session_maker):
+    claim, certificates, *_ = await run_query(
+        seeded, session_maker,
+        lambda session: subscription_crud.claim_expired_subs(
+            1, USERS, session))
+
+    assert 'ix_subscription_end_date_active' in claim
+    assert 'ix_certificate_subscription_id' in certificates
+
+
+async def test_claim_expiring_uses_end_date_index(seeded, session_maker):
+    plans = await run_query(
+        seeded, session_maker,
+        lambda session: subscription_crud.claim_expiring_subs(
+            1, USERS, settings.REMINDER_HORIZONS, session))
+
+    horizons = plans[:len(settings.REMINDER_HORIZONS)]
+    assert all('ix_subscription_end_date_active' in plan
+               for plan in horizons)
+
+
+@pytest.mark.parametrize('profile', ['menu', 'billing', 'full'])
+async def test_user_lookup_uses_user_indexes(seeded, session_maker, profile):
+    plans = await run_query(
+        seeded, session_maker,
+        lambda session: user_crud.get_by_tg_id(
+            1000000 + USERS // 2, session, profile))
+
+    indexes = set().union(*plans)
+    assert 'ix_subscription_user_id' in indexes
+    if profile != 'menu':
+        assert 'ix_certificate_subscription_id' in indexes
+
+
+async def test_success_payments_use_user_status_index(seeded, session_maker):
+    [plan] = await run_query(
+        seeded, session_maker,
+        lambda session: payment_crud.get_by_success_user(
+            USERS // 2, session))
+
+    assert 'ix_payment_user_id_status' in plan
+
+
+async def test_referral_by_invited_uses_index(seeded, session_maker):
+    [plan] = await run_query(
+        seeded, session_maker,
+        lambda session: referral_crud.get_by_invite(USERS // 2 + 1, session))
+
+    assert 'ix_referralbonus_invited_id' in plan
+
+
+async def test_servers_for_issue_use_region_protocol_index(
+        seeded, session_maker):
+    plans = await run_query(
+        seeded, session_maker,
+        lambda session: server_crud.get_server_region_and_protocol(
+            'ah', 'openvpn', session))
+
+    assert 'ix_server_region_id_protocol_active' in plans[-1]
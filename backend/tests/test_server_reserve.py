@@ -0,0 +1,71 @@
+"""Резервирование мест на сервере при одновременных покупках."""
+import asyncio
+
+from app.crud.server import server_crud
+from app.models.server import Region, Server, VPNProtocol
+
+CONCURRENT_REQUESTS = 50
+
+
+async def create_server(session_maker, max_certificates, current_cert_count):
+    async with session_maker() as session:
+        server = Server(
+            ip_address='10.0.0.1',
+            domain_name='nl1.example.com',
+            protocol=VPNProtocol.openvpn,
+            is_active=True,
+            max_certificates=max_certificates,
+            current_cert_count=current_cert_count,
+            region=Region(code='nl', name='Нидерланды'),
+        )
+        session.add(server)
+        await session.commit()
+        return server.id
+
+
+async def reserve_concurrently(session_maker, server_id, count):
+    async def reserve():
+        async with session_maker() as session:
+            return await server_crud.reserve(server_id, count, session)
+
+    return await asyncio.gather(
+        *(reserve() for _ in range(CONCURRENT_REQUESTS)))
+
+
+async def get_server(session_maker, server_id) -> Server:
+    async with session_maker() as session:
+        return await session.get(Server, server_id)
+
+
+async def test_last_slot_reserved_once(session_maker):
+    server_id = await create_server(session_maker, 10, 9)
+
+    results = await reserve_concurrently(session_maker, server_id, 1)
+
+    assert sum(result is not None for result in results) == 1
+    server = await get_server(session_maker, server_id)
+    assert server.current_cert_count == server.max_certificates
+    assert not server.is_active
+
+
+async def test_reservations_never_exceed_capacity(session_maker):
+    server_id = await create_server(session_maker, 25, 0)
+
+    results = await reserve_concurrently(session_maker, server_id, 2)
+
+    assert sum(result is not None for result in results) == 12
+    server = await get_server(session_maker, server_id)
+    assert server.current_cert_count == 24
+    assert server.current_cert_count <= server.max_certificates
+
+
+async def test_release_returns_slots(session_maker):
+    server_id = await create_server(session_maker, 10, 9)
+    async with session_maker() as session:
+        assert await server_crud.reserve(server_id, 1, session) is not None
+        assert await server_crud.reserve(server_id, 1, session) is None
+        await server_crud.release(server_id, 1, session)
+
+    server = await get_server(session_maker, server_id)
+    assert server.current_cert_count == 9
+    assert server.is_active
@@ -0,0 +1,146 @@
+"""Профили загрузки пользователя: число запросов и отсутствие
+ленивых загрузок."""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import InvalidRequestError
+
+from app.crud.user import user_crud
+from app.models.payment import Payment, PaymentStatus, ReferralBonus
+from app.models.server import Certificate, Region, Server, VPNProtocol
+from app.models.subscription import Subscription, SubscriptionType
+from app.models.user import User
+
+TELEGRAM_ID = 1001
+
+# Профиль: число запросов и данные, которые он обязан загрузить
+PROFILES = {
+    'minimal': 1,
+    'menu': 1,
+    'billing': 4,
+    'full': 6,
+}
+
+
+def read_menu(user: User) -> None:
+    for subscription in user.subscription:
+        subscription.region.code
+
+
+def read_billing(user: User) -> None:
+    read_menu(user)
+    for subscription in user.subscription:
+        [cert.filename for cert in subscription.certificates]
+    [invite.bonus_size for invite in user.invites]
+
+
+def read_full(user: User) -> None:
+    read_billing(user)
+    for subscription in user.subscription:
+        [cert.server.domain_name for cert in subscription.certificates]
+    [payment.status for payment in user.payments]
+    [referral.invited_id for referral in user.referrals]
+
+
+READERS = {
+    'minimal': lambda user: None,
+    'menu': read_menu,
+    'billing': read_billing,
+    'full': read_full,
+}
+
+
+@pytest.fixture
+async def user_with_data(session_maker):
+    async with session_maker() as session:
+        region = Region(code='nl', name='Нидерланды')
+        server = Server(
+            ip_address='10.0.0.1',
+            domain_name='nl1.example.com',
+            protocol=VPNProtocol.openvpn,
+            is_active=True,
+            max_certificates=100,
+            current_cert_count=4,
+            region=region,
+        )
+        user = User(telegram_id=TELEGRAM_ID, ref_count=1)
+        invited = User(telegram_id=TELEGRAM_ID + 1, ref_count=0)
+        inviter = User(telegram_id=TELEGRAM_ID + 2, ref_count=1)
+        session.add_all([server, user, invited, inviter])
+        await session.flush()
+        for number in range(2):
+            subscription = Subscription(
+                type=SubscriptionType.devices_2,
+                protocol=VPNProtocol.openvpn,
+                end_date=datetime.now() + timedelta(days=30),
+                is_active=True,
+                user_id=user.id,
+                region_id=region.id,
+            )
+            session.add(subscription)
+            await session.flush()
+            session.add_all([
+                Certificate(
+                    filename=f'https://nl1/d/{number}-{device}.ovpn',
+                    server_id=server.id,
+                    subscription_id=subscription.id,
+                )
+                for device in range(2)
+            ])
+        session.add_all([
+            Payment(
+                amount=Decimal(100),
+                provider='yookassa',
+                status=PaymentStatus.success,
+                operation_id='op-1',
+                user_id=user.id,
+            ),
+            ReferralBonus(
+                bonus_given=False,
+                bonus_size=Decimal(50),
+                invited_id=user.id,
+                user_id=inviter.id,
+            ),
+            ReferralBonus(
+                bonus_given=False,
+                bonus_size=Decimal(50),
+                invited_id=invited.id,
+                user_id=user.id,
+            ),
+        ])
+        await session.commit()
+
+
+@pytest.mark.parametrize('profile', PROFILES)
+async def test_profile_statement_count(
+        engine, session_maker, user_with_data, profile):
+    statements = []
+
+    def before_cursor_execute(*args):
+        statements.append(args[2])
+
+    async with session_maker() as session:
+        await session.execute(text('SELECT 1'))
+        event.listen(engine.sync_engine, 'before_cursor_execute',
+                     before_cursor_execute)
+        try:
+            user = await user_crud.get_by_tg_id(
+                TELEGRAM_ID, session, profile)
+            READERS[profile](user)
+        finally:
+            event.remove(engine.sync_engine, 'before_cursor_execute',
+                         before_cursor_execute)
+
+    assert len(statements) == PROFILES[profile], statements
+
+
+@pytest.mark.parametrize('profile', ['minimal', 'menu'])
+async def test_profile_does_not_load_more(
+        session_maker, user_with_data, profile):
+    async with session_maker() as session:
+        user = await user_crud.get_by_tg_id(TELEGRAM_ID, session, profile)
+
+        with pytest.raises(InvalidRequestError):
+            READERS['billing' if profile == 'menu' else 'menu'](user)
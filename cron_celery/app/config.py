@@ -13,6 +13,9 @@ class Settings(BaseSettings):
     LOG_DIR: str = 'logs'
     MAX_RETRIES: int = 3
     DEF_RETRY_DELAY: int = 5
+    REQUEST_TIMEOUT: int = 30
+    NOTIFY_POLL_INTERVAL: int = 10
+    NOTIFY_JOB_TIMEOUT: int = 3600
     TG_HOST: str
     TG_PORT: int
     BACKEND_HOST: str
@@ -1,3 +1,5 @@
+import time
+
 import requests
 
 from app.config import settings
@@ -5,6 +7,11 @@ from app.logger import logger
 from app.main import celery_app
 
 
+def get_notify_url() -> str:
+    return (f'{settings.get_backend_url}/'
+            f'{settings.NOTIFY_PATH}/{settings.SUBSCRIPTION_PATH}')
+
+
 @celery_app.task(
     name='notify_users',
     bind=True,
@@ -12,15 +19,59 @@ from app.main import celery_app
     default_retry_delay=settings.DEF_RETRY_DELAY,
 )
 def notify_users(self):
-    """Задача по уведомлению клиентов о статусе подписки."""
-    url = (f'{settings.get_backend_url}/'
-           f'{settings.NOTIFY_PATH}/{settings.SUBSCRIPTION_PATH}')
+    """Задача по уведомлению клиентов о статусе подписки.
+
+    Только запускает задачу backend, за ее ходом следит
+    watch_notify_job, воркер не ждет завершения.
+    """
+    url = get_notify_url()
+    try:
+        response = requests.get(url, timeout=settings.REQUEST_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException as error:
+        logger.error(f'Ошибка обращения к {url}: {error}')
+        raise self.retry(exc=error)
+    job_id = response.json()['job_id']
+    logger.info(f'Задача уведомления клиентов {job_id} запущена.')
+    watch_notify_job.apply_async(
+        args=(job_id, time.time() + settings.NOTIFY_JOB_TIMEOUT),
+        countdown=settings.NOTIFY_POLL_INTERVAL,
+    )
+    return job_id
+
+
+@celery_app.task(
+    name='watch_notify_job',
+    bind=True,
+    max_retries=settings.MAX_RETRIES,
+    default_retry_delay=settings.DEF_RETRY_DELAY,
+)
+def watch_notify_job(self, job_id: str, deadline: float):
+    """Одна проверка задачи backend, пока она выполняется,
+    проверка откладывается на NOTIFY_POLL_INTERVAL."""
+    url = f'{get_notify_url()}/{job_id}'
     try:
-        response = requests.get(url)
+        response = requests.get(url, timeout=settings.REQUEST_TIMEOUT)
         response.raise_for_status()
     except requests.RequestException as error:
         logger.error(f'Ошибка обращения к {url}: {error}')
-        self.retry(exc=error)
+        raise self.retry(exc=error)
+    job = response.json()
+    if job['status'] == 'running':
+        if time.time() > deadline:
+            logger.warning(f'Задача {job_id} не завершилась за '
+                           f'{settings.NOTIFY_JOB_TIMEOUT} сек.')
+            return job
+        logger.info(f'Задача {job_id}: отключено {job["processed"]}, '
+                    f'ошибок {job["failed"]}, осталось {job["remaining"]}.')
+        watch_notify_job.apply_async(
+            args=(job_id, deadline),
+            countdown=settings.NOTIFY_POLL_INTERVAL,
+        )
+    elif job['status'] == 'failed':
+        logger.error(f'Задача {job_id} завершилась ошибкой: {job["error"]}')
     else:
-        logger.info('Запрос на уведомление клиентов отправлен успешно.')
-    return True
+        logger.info(f'Задача {job_id} выполнена за {job["duration"]:.1f} '
+                    f'сек.: отключено {job["processed"]}, ошибок '
+                    f'{job["failed"]}, уведомлений {job["notified"]}.')
+    return job
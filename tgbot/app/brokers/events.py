@@ -0,0 +1,32 @@
+from uuid import uuid4
+
+from faststream.rabbit import ExchangeType, RabbitExchange, RabbitQueue
+
+from app.core.broker import broker
+from app.core.catalogue import server_catalogue
+from app.core.user_cache import user_cache
+from app.schemas.server import ServerChangedEvent
+from app.schemas.user import UserChangedEvent
+
+# Каждый процесс бота получает события в свою очередь,
+# чтобы сбросить собственный кэш.
+PROCESS_ID = uuid4().hex
+
+user_changed_exchange = RabbitExchange(
+    'user_changed', type=ExchangeType.FANOUT)
+user_changed_queue = RabbitQueue(
+    f'user_changed.{PROCESS_ID}', auto_delete=True)
+servers_changed_exchange = RabbitExchange(
+    'servers_changed', type=ExchangeType.FANOUT)
+servers_changed_queue = RabbitQueue(
+    f'servers_changed.{PROCESS_ID}', auto_delete=True)
+
+
+@broker.subscriber(user_changed_queue, user_changed_exchange)
+async def invalidate_user(data: UserChangedEvent):
+    user_cache.invalidate(data.telegram_id)
+
+
+@broker.subscriber(servers_changed_queue, servers_changed_exchange)
+async def invalidate_servers(data: ServerChangedEvent):
+    server_catalogue.invalidate()
@@ -1,31 +1,91 @@
 from app.core.broker import broker
-from app.core.bot import bot
+from app.core.logger import logger
+from app.core.sender import message_sender
+from app.core.user_cache import user_cache
 from app.keyboards.inline import keys_inline_kb
 from app.messages.common import NotifyMessage
-from app.schemas.subscription import SubscriptionNotifyDB
+from app.schemas.subscription import (
+    SubscriptionNotifyDB,
+    SubscriptionNotifyDigest,
+)
 
 
-@broker.subscriber('notify_deactivate_sub')
-async def send_notify_deactivate_sub(data: SubscriptionNotifyDB):
-    await bot.send_message(
+def expire_when(days_left: int | None) -> str:
+    """Когда заканчивается подписка, без срока - завтра."""
+    if days_left is None or days_left == 1:
+        return NotifyMessage.EXPIRE_TOMORROW
+    if days_left <= 0:
+        return NotifyMessage.EXPIRE_TODAY
+    if days_left % 10 == 1 and days_left % 100 != 11:
+        unit = NotifyMessage.DAYS_UNITS[0]
+    elif 2 <= days_left % 10 <= 4 and not 12 <= days_left % 100 <= 14:
+        unit = NotifyMessage.DAYS_UNITS[1]
+    else:
+        unit = NotifyMessage.DAYS_UNITS[2]
+    return NotifyMessage.EXPIRE_IN_DAYS.format(days=days_left, unit=unit)
+
+
+def subscription_fields(data: SubscriptionNotifyDB) -> dict[str, str]:
+    return {
+        'type': data.type.value,
+        'region': data.region,
+        'protocol': data.protocol.value,
+        'when': expire_when(data.days_left),
+    }
+
+
+def render_digest(data: SubscriptionNotifyDigest) -> str:
+    """Один текст по всем подпискам пользователя."""
+    parts = []
+    for subs, single, many, item in (
+        (data.expiring, NotifyMessage.EXPIRE_SOON_TEMPLATE,
+         NotifyMessage.DIGEST_EXPIRING, NotifyMessage.DIGEST_EXPIRING_ITEM),
+        (data.expired, NotifyMessage.EXPIRED_TEMPLATE,
+         NotifyMessage.DIGEST_EXPIRED, NotifyMessage.DIGEST_ITEM),
+    ):
+        if len(subs) == 1:
+            parts.append(single.format(**subscription_fields(subs[0])))
+        elif subs:
+            parts.append(many.format(items='\n'.join(
+                item.format(**subscription_fields(sub)) for sub in subs)))
+    return '\n\n'.join(parts)
+
+
+@broker.subscriber('notify_subs_digest')
+async def send_notify_digest(data: SubscriptionNotifyDigest):
+    user_cache.invalidate(data.telegram_id)
+    text = render_digest(data)
+    if not text:
+        return
+    await message_sender.enqueue(
         chat_id=data.telegram_id,
-        text=NotifyMessage.EXPIRED_TEMPLATE.format(
-            type=data.type,
-            region=data.region,
-            protocol=data.protocol,
-        ),
+        text=text,
         reply_markup=keys_inline_kb()
     )
 
 
-@broker.subscriber('notify_end_sub')
-async def send_notify_end_sub(data: SubscriptionNotifyDB):
-    await bot.send_message(
+# Очереди по одной подписке остаются для сообщений,
+# опубликованных до перехода backend на дайджесты.
+async def send_single_notify(data: SubscriptionNotifyDB, template: str):
+    """Сообщение по одной подписке, в дайджесте telegram_id не передается,
+    такие элементы без получателя пропускаются."""
+    if data.telegram_id is None:
+        logger.warning(f'Уведомление о подписке без telegram_id '
+                       f'пропущено: {data!r}')
+        return
+    user_cache.invalidate(data.telegram_id)
+    await message_sender.enqueue(
         chat_id=data.telegram_id,
-        text=NotifyMessage.TOMORROW_EXPIRE_TEMPLATE.format(
-            type=data.type.value,
-            region=data.region,
-            protocol=data.protocol.value,
-        ),
+        text=template.format(**subscription_fields(data)),
         reply_markup=keys_inline_kb()
     )
+
+
+@broker.subscriber('notify_deactivate_sub')
+async def send_notify_deactivate_sub(data: SubscriptionNotifyDB):
+    await send_single_notify(data, NotifyMessage.EXPIRED_TEMPLATE)
+
+
+@broker.subscriber('notify_end_sub')
+async def send_notify_end_sub(data: SubscriptionNotifyDB):
+    await send_single_notify(data, NotifyMessage.TOMORROW_EXPIRE_TEMPLATE)
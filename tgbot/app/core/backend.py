@@ -0,0 +1,136 @@
+import asyncio
+from typing import Any
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.schemas.subscription import SubscriptionCreate, SubscriptionRenew
+from app.schemas.user import UserBase
+
+
+class BackendClient:
+    """Клиент backend с общим пулом keep-alive соединений."""
+
+    def __init__(self) -> None:
+        self._session: ClientSession | None = None
+
+    async def start(self) -> None:
+        """Создание сессии и коннектора при запуске бота."""
+        if self._session is not None and not self._session.closed:
+            return
+        connector = TCPConnector(
+            limit=settings.BACKEND_POOL_LIMIT,
+            ttl_dns_cache=settings.BACKEND_DNS_TTL,
+            keepalive_timeout=settings.BACKEND_KEEPALIVE,
+        )
+        self._session = ClientSession(
+            base_url=settings.get_backend_url,
+            connector=connector,
+            timeout=ClientTimeout(total=settings.BACKEND_TIMEOUT),
+        )
+
+    async def close(self) -> None:
+        """Закрытие сессии при остановке бота."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @property
+    def session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError('Клиент backend не запущен')
+        return self._session
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        timeout: float,
+        expected: tuple[int, ...] = (200,),
+        **kwargs: Any,
+    ) -> Any | None:
+        """Запрос к backend, при ошибке возвращает None."""
+        try:
+            async with self.session.request(
+                method,
+                path,
+                timeout=ClientTimeout(total=timeout),
+                **kwargs,
+            ) as response:
+                if response.status not in expected:
+                    logger.warning(
+                        f'Backend {method} {path} ответил {response.status}')
+                    return None
+                return await response.json()
+        except (ClientError, asyncio.TimeoutError) as error:
+            logger.error(f'Ошибка запроса {method} {path}: {error!r}')
+            return None
+
+    async def auth(self, user: UserBase) -> dict | None:
+        """Авторизация пользователя и получение его подписок."""
+        return await self._request(
+            'POST',
+            settings.AUTH_PATH,
+            settings.BACKEND_AUTH_TIMEOUT,
+            expected=(201,),
+            json=user.model_dump(),
+        )
+
+    async def get_active_servers(self) -> list[dict] | None:
+        """Список активных серверов с регионами."""
+        return await self._request(
+            'GET', settings.SERVER_PATH, settings.BACKEND_TIMEOUT)
+
+    async def get_prices(self) -> list[dict] | None:
+        """Цены на подписки."""
+        return await self._request(
+            'GET',
+            settings.SUBSCRIPTION_PATH + settings.PRICE_PATH,
+            settings.BACKEND_TIMEOUT,
+        )
+
+    async def get_subscriptions(self, tg_id: int) -> list[dict] | None:
+        """Подписки пользователя со ссылками на сертификаты."""
+        return await self._request(
+            'GET',
+            f'{settings.SUBSCRIPTION_PATH}{tg_id}',
+            settings.BACKEND_TIMEOUT,
+        )
+
+    async def get_bonus_info(self, tg_id: int) -> dict | None:
+        """Информация о реферальных бонусах пользователя."""
+        return await self._request(
+            'GET',
+            f'{settings.PAYMENT_PATH}{tg_id}',
+            settings.BACKEND_TIMEOUT,
+        )
+
+    async def create_subscription(
+        self,
+        payload: SubscriptionCreate,
+    ) -> dict | None:
+        """Пробная подписка или ссылка на оплату новой подписки."""
+        return await self._request(
+            'POST',
+            settings.SUBSCRIPTION_PATH,
+            settings.BACKEND_SUBSCRIPTION_TIMEOUT,
+            expected=(200, 201),
+            json=payload.model_dump(mode='json'),
+        )
+
+    async def renew_subscription(
+        self,
+        payload: SubscriptionRenew,
+    ) -> dict | None:
+        """Ссылка на оплату продления подписки."""
+        return await self._request(
+            'PATCH',
+            settings.SUBSCRIPTION_PATH,
+            settings.BACKEND_SUBSCRIPTION_TIMEOUT,
+            expected=(200, 201),
+            json=payload.model_dump(mode='json'),
+        )
+
+
+backend_client = BackendClient()
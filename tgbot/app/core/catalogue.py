@@ -0,0 +1,73 @@
+import asyncio
+import contextlib
+
+from app.core.backend import backend_client
+from app.core.config import settings
+from app.core.logger import logger
+
+
+class ServerCatalogue:
+    """Каталог активных серверов в памяти бота.
+
+    Загружается при запуске, обновляется в фоне по таймеру
+    и по событию backend об изменении серверов.
+    """
+
+    def __init__(self, refresh_interval: float) -> None:
+        self.refresh_interval = refresh_interval
+        self._servers: tuple[dict, ...] = ()
+        self._stale = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def servers(self) -> tuple[dict, ...]:
+        """Текущий снимок каталога (общий для всех пользователей)."""
+        return self._servers
+
+    async def refresh(self) -> None:
+        """Загрузка каталога, при ошибке остается прежний снимок."""
+        async with self._lock:
+            servers = await backend_client.get_active_servers()
+            if servers is None:
+                logger.warning('Каталог серверов не обновлен')
+                return
+            self._servers = tuple(servers)
+            logger.info(f'Каталог серверов обновлен: {len(servers)} шт.')
+
+    async def get_servers(self) -> tuple[dict, ...]:
+        """Снимок каталога, пустой каталог загружается сразу."""
+        if not self._servers:
+            await self.refresh()
+        return self._servers
+
+    def invalidate(self) -> None:
+        """Пометить каталог устаревшим, обновит фоновая задача."""
+        self._stale.set()
+
+    async def _run(self) -> None:
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self._stale.wait(), timeout=self.refresh_interval)
+            self._stale.clear()
+            try:
+                await self.refresh()
+            except Exception as error:
+                logger.error(f'Ошибка обновления каталога: {error!r}')
+
+    async def start(self) -> None:
+        await self.refresh()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+server_catalogue = ServerCatalogue(
+    refresh_interval=settings.SERVER_CATALOGUE_REFRESH)
@@ -13,6 +13,7 @@ class Settings(BaseSettings):
     TG_PORT: int
     WEBHOOK_SECRET: str
     WEBHOOK_PATH: str = '/webhook'
+    WEBHOOK_DELETE_ON_SHUTDOWN: bool = True
     BACKEND_HOST: str
     BACKEND_PORT: int
     AUTH_PATH: str = '/auth/'
@@ -20,6 +21,34 @@ class Settings(BaseSettings):
     PAYMENT_PATH: str = '/payment/'
     SUBSCRIPTION_PATH: str = '/subscription/'
     PRICE_PATH: str = 'price'
+    BACKEND_POOL_LIMIT: int = 64
+    BACKEND_DNS_TTL: int = 300
+    BACKEND_KEEPALIVE: float = 30.0
+    BACKEND_TIMEOUT: float = 10.0
+    BACKEND_AUTH_TIMEOUT: float = 3.0
+    BACKEND_SUBSCRIPTION_TIMEOUT: float = 60.0
+    USER_CACHE_TTL: int = 300
+    USER_CACHE_MAX_SIZE: int = 50_000
+    SERVER_CATALOGUE_REFRESH: int = 300
+    FSM_STORAGE: str = 'memory'
+    FSM_STATE_TTL: int = 86_400
+    FSM_DATA_TTL: int = 86_400
+    FSM_MAX_KEYS: int = 100_000
+    FSM_MAX_BYTES: int = 64 * 1024 * 1024
+    METRICS_PATH: str = '/metrics'
+    SENDER_GLOBAL_RATE: float = 30.0
+    SENDER_CHAT_RATE: float = 1.0
+    SENDER_QUEUE_SIZE: int = 10_000
+    SENDER_WORKERS: int = 8
+    # Число процессов бота, общий лимит делится между ними
+    SENDER_PROCESSES: int = 1
+    SENDER_MAX_RETRIES: int = 3
+    SENDER_DRAIN_TIMEOUT: float = 10.0
+    REDIS_HOST: str = 'localhost'
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    REDIS_USER: str = 'default'
+    REDIS_USER_PASSWORD: str = ''
     RABBITMQ_DEFAULT_USER: str
     RABBITMQ_DEFAULT_PASS: str
     RABBIT_HOST: str
@@ -46,6 +75,13 @@ class Settings(BaseSettings):
         """Ссылка для обращений к backend."""
         return f'http://{self.BACKEND_HOST}:{self.BACKEND_PORT}'
 
+    @property
+    def get_redis_url(self) -> str:
+        """Ссылка для подключения к redis."""
+        return (f'redis://{self.REDIS_USER}:'
+                f'{self.REDIS_USER_PASSWORD}@'
+                f'{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}')
+
     @property
     def get_rabbit_url(self) -> str:
         """Ссылка для подключения к rabbitMQ."""
@@ -1,10 +1,10 @@
 from aiogram import Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 
+from app.core.storage import build_storage
 from app.handlers.routers import main_router
 from app.middleware.user import UserMiddleware
 
-dp = Dispatcher(storage=MemoryStorage())
+dp = Dispatcher(storage=build_storage())
 dp.include_router(main_router)
 
 dp.callback_query.middleware(UserMiddleware())
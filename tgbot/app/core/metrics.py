@@ -0,0 +1,28 @@
+from aiohttp import web
+
+from app.core.catalogue import server_catalogue
+from app.core.dispatcher import dp
+from app.core.sender import message_sender
+from app.core.storage import BoundedMemoryStorage
+from app.core.user_cache import user_cache
+
+
+def collect_metrics() -> dict[str, int]:
+    """Текущие значения метрик процесса бота."""
+    metrics = {
+        'tgbot_user_cache_size': len(user_cache),
+        'tgbot_server_catalogue_size': len(server_catalogue.servers),
+    }
+    metrics.update({f'tgbot_sender_{name}': value
+                    for name, value in message_sender.stats().items()})
+    if isinstance(dp.storage, BoundedMemoryStorage):
+        metrics.update({f'tgbot_fsm_{name}': value
+                        for name, value in dp.storage.stats().items()})
+    return metrics
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    """Метрики в текстовом формате Prometheus."""
+    text = ''.join(f'{name} {value}\n'
+                   for name, value in collect_metrics().items())
+    return web.Response(text=text)
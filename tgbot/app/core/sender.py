@@ -0,0 +1,217 @@
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass
+
+from aiogram.exceptions import (
+    TelegramAPIError,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from aiogram.types import InlineKeyboardMarkup
+
+from app.core.bot import bot
+from app.core.config import settings
+from app.core.logger import logger
+
+BUCKETS_PRUNE_INTERVAL = 60.0
+
+
+@dataclass(slots=True)
+class OutgoingMessage:
+    """Сообщение в очереди на отправку."""
+
+    chat_id: int
+    text: str
+    reply_markup: InlineKeyboardMarkup | None = None
+
+
+class TokenBucket:
+    """Ограничение частоты: rate токенов в секунду, не больше capacity."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Сколько ждать до появления токена, 0 - токен есть."""
+        self.refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self.refill(now)
+        return self.tokens >= self.capacity
+
+
+class MessageSender:
+    """Очередь исходящих сообщений бота с ограничением частоты.
+
+    Общий лимит и лимит на чат соблюдаются через token bucket,
+    при ответе 429 отправка приостанавливается на retry_after
+    для всех воркеров, сообщение повторяется. Очередь ограничена:
+    при заполнении enqueue ждет, притормаживая потребителя брокера.
+
+    Лимиты хранятся в памяти процесса. Бот рассчитан на один процесс,
+    если их несколько (SENDER_PROCESSES), global_rate передается
+    уже поделенным на число процессов.
+    """
+
+    def __init__(
+        self,
+        global_rate: float,
+        chat_rate: float,
+        queue_size: int,
+        workers: int,
+        max_retries: int,
+    ) -> None:
+        self.chat_rate = chat_rate
+        self.workers = workers
+        self.max_retries = max_retries
+        self._global = TokenBucket(global_rate, max(global_rate, 1))
+        self._chats: dict[int, TokenBucket] = {}
+        self._pruned_at = time.monotonic()
+        self._paused_until = 0.0
+        self._queue: asyncio.Queue[OutgoingMessage] | None = None
+        self._queue_size = queue_size
+        self._tasks: list[asyncio.Task] = []
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.throttled = 0
+
+    async def enqueue(
+        self,
+        chat_id: int,
+        text: str,
+        reply_markup: InlineKeyboardMarkup | None = None,
+    ) -> None:
+        """Поставить сообщение в очередь на отправку."""
+        await self._queue.put(OutgoingMessage(chat_id, text, reply_markup))
+
+    def _chat_bucket(self, chat_id: int, now: float) -> TokenBucket:
+        if now - self._pruned_at > BUCKETS_PRUNE_INTERVAL:
+            self._chats = {
+                key: bucket for key, bucket in self._chats.items()
+                if not bucket.is_full(now)}
+            self._pruned_at = now
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, 1)
+        return bucket
+
+    async def _acquire(self, chat_id: int) -> None:
+        """Ожидание разрешения на отправку в чат."""
+        while True:
+            now = time.monotonic()
+            wait = self._paused_until - now
+            if wait <= 0:
+                chat = self._chat_bucket(chat_id, now)
+                wait = max(self._global.wait_time(now), chat.wait_time(now))
+                if wait <= 0:
+                    self._global.consume()
+                    chat.consume()
+                    return
+            await asyncio.sleep(wait)
+
+    async def _send(self, message: OutgoingMessage) -> None:
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(message.chat_id)
+            try:
+                await bot.send_message(
+                    chat_id=message.chat_id,
+                    text=message.text,
+                    reply_markup=message.reply_markup,
+                )
+                self.sent += 1
+                return
+            except TelegramRetryAfter as error:
+                self.throttled += 1
+                self._paused_until = max(
+                    self._paused_until,
+                    time.monotonic() + error.retry_after)
+                logger.warning(
+                    f'Лимит Telegram, пауза {error.retry_after} сек.')
+            except TelegramForbiddenError:
+                self.failed += 1
+                logger.info(f'Бот заблокирован в чате {message.chat_id}')
+                return
+            except (TelegramNetworkError, TelegramServerError) as error:
+                logger.warning(f'Ошибка отправки в {message.chat_id}: '
+                               f'{error!r}')
+                await asyncio.sleep(2 ** attempt)
+            except TelegramAPIError as error:
+                self.failed += 1
+                logger.error(f'Сообщение в {message.chat_id} '
+                             f'не отправлено: {error!r}')
+                return
+            self.retried += 1
+        self.failed += 1
+        logger.error(f'Сообщение в {message.chat_id} не отправлено, '
+                     f'исчерпаны попытки')
+
+    async def _worker(self) -> None:
+        while True:
+            message = await self._queue.get()
+            try:
+                await self._send(message)
+            except Exception as error:
+                self.failed += 1
+                logger.error(f'Ошибка очереди отправки: {error!r}')
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> dict[str, int]:
+        """Метрики очереди отправки."""
+        return {
+            'queued': self._queue.qsize() if self._queue else 0,
+            'sent': self.sent,
+            'failed': self.failed,
+            'retried': self.retried,
+            'throttled': self.throttled,
+        }
+
+    async def start(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker())
+                           for _ in range(self.workers)]
+
+    async def stop(self, timeout: float | None = None) -> None:
+        """Остановка воркеров, очередь дожидается не дольше timeout."""
+        if self._queue is not None and timeout:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        if self._queue is not None and self._queue.qsize():
+            logger.warning(f'Не отправлено сообщений: {self._queue.qsize()}')
+
+
+message_sender = MessageSender(
+    global_rate=settings.SENDER_GLOBAL_RATE / settings.SENDER_PROCESSES,
+    chat_rate=settings.SENDER_CHAT_RATE,
+    queue_size=settings.SENDER_QUEUE_SIZE,
+    workers=settings.SENDER_WORKERS,
+    max_retries=settings.SENDER_MAX_RETRIES,
+)
@@ -0,0 +1,267 @@
+import json
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import (
+    BaseStorage,
+    DefaultKeyBuilder,
+    KeyBuilder,
+    StateType,
+    StorageKey,
+)
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+
+def dumps(value: Any) -> str:
+    """Компактная сериализация значения поля."""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def loads(value: bytes | str) -> Any:
+    return json.loads(value)
+
+
+def deep_sizeof(value: Any, seen: set[int] | None = None) -> int:
+    """Приблизительный размер значения в байтах вместе с вложенными."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen)
+                    for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    return size
+
+
+@dataclass(slots=True)
+class MemoryRecord:
+    """Запись FSM хранилища в памяти."""
+
+    expires_at: float
+    state: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+    size: int = 0
+
+
+class BoundedMemoryStorage(BaseStorage):
+    """FSM хранилище в памяти процесса с ограничением размера.
+
+    В отличие от MemoryStorage запись не создается при чтении,
+    брошенные сценарии удаляются по TTL, а при превышении лимита
+    записей или байт вытесняются давно не использованные.
+    Записи упорядочены по последнему обращению, поэтому
+    устаревшие всегда находятся в начале словаря.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_keys: int,
+        max_bytes: int,
+    ) -> None:
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.max_bytes = max_bytes
+        self._records: OrderedDict[StorageKey, MemoryRecord] = OrderedDict()
+        self._bytes = 0
+        self.expired = 0
+        self.evicted = 0
+
+    async def close(self) -> None:
+        self._records.clear()
+        self._bytes = 0
+
+    def _purge(self, now: float) -> None:
+        """Удаление устаревших записей из начала словаря."""
+        while self._records:
+            key, record = next(iter(self._records.items()))
+            if record.expires_at > now:
+                break
+            self._drop(key)
+            self.expired += 1
+
+    def _drop(self, key: StorageKey) -> None:
+        record = self._records.pop(key, None)
+        if record is not None:
+            self._bytes -= record.size
+
+    def _get(self, key: StorageKey) -> MemoryRecord | None:
+        now = time.monotonic()
+        self._purge(now)
+        record = self._records.get(key)
+        if record is not None:
+            record.expires_at = now + self.ttl
+            self._records.move_to_end(key)
+        return record
+
+    def _put(
+        self,
+        key: StorageKey,
+        state: str | None,
+        data: dict[str, Any],
+    ) -> None:
+        """Сохранение записи, пустая запись удаляется."""
+        self._drop(key)
+        if state is None and not data:
+            return
+        record = MemoryRecord(
+            expires_at=time.monotonic() + self.ttl,
+            state=state,
+            data=data,
+            size=deep_sizeof(data),
+        )
+        self._records[key] = record
+        self._bytes += record.size
+        while self._records and (len(self._records) > self.max_keys or
+                                 self._bytes > self.max_bytes):
+            self._drop(next(iter(self._records)))
+            self.evicted += 1
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = self._get(key)
+        self._put(
+            key,
+            state.state if isinstance(state, State) else state,
+            record.data if record else {},
+        )
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        record = self._get(key)
+        return record.state if record else None
+
+    async def set_data(self, key: StorageKey, data: dict[str, Any]) -> None:
+        record = self._get(key)
+        self._put(key, record.state if record else None, data.copy())
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        record = self._get(key)
+        return record.data.copy() if record else {}
+
+    def stats(self) -> dict[str, int]:
+        """Метрики хранилища."""
+        self._purge(time.monotonic())
+        return {
+            'keys': len(self._records),
+            'bytes': self._bytes,
+            'expired': self.expired,
+            'evicted': self.evicted,
+        }
+
+
+class RedisStorage(BaseStorage):
+    """FSM хранилище в Redis, общее для нескольких процессов бота.
+
+    Состояние хранится строкой, данные - hash, где каждое поле
+    сериализовано отдельно. Обновление данных выполняется одним
+    pipeline без предварительного чтения, на ключи ставится TTL.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        key_builder: KeyBuilder | None = None,
+        state_ttl: int | None = None,
+        data_ttl: int | None = None,
+    ) -> None:
+        self.redis = redis
+        self.key_builder = key_builder or DefaultKeyBuilder()
+        self.state_ttl = state_ttl
+        self.data_ttl = data_ttl
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> 'RedisStorage':
+        return cls(redis=Redis.from_url(url), **kwargs)
+
+    async def close(self) -> None:
+        await self.redis.aclose(close_connection_pool=True)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        redis_key = self.key_builder.build(key, 'state')
+        if state is None:
+            await self.redis.delete(redis_key)
+            return
+        await self.redis.set(
+            redis_key,
+            state.state if isinstance(state, State) else state,
+            ex=self.state_ttl,
+        )
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        value = await self.redis.get(self.key_builder.build(key, 'state'))
+        if isinstance(value, bytes):
+            return value.decode('utf-8')
+        return value
+
+    async def set_data(self, key: StorageKey, data: dict[str, Any]) -> None:
+        redis_key = self.key_builder.build(key, 'data')
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(redis_key)
+            if data:
+                pipe.hset(
+                    redis_key,
+                    mapping={field: dumps(value)
+                             for field, value in data.items()},
+                )
+                if self.data_ttl:
+                    pipe.expire(redis_key, self.data_ttl)
+            await pipe.execute()
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        raw = await self.redis.hgetall(self.key_builder.build(key, 'data'))
+        return {field.decode('utf-8'): loads(value)
+                for field, value in raw.items()}
+
+    async def get_value(
+        self,
+        storage_key: StorageKey,
+        dict_key: str,
+        default: Any | None = None,
+    ) -> Any | None:
+        value = await self.redis.hget(
+            self.key_builder.build(storage_key, 'data'), dict_key)
+        return default if value is None else loads(value)
+
+    async def update_data(
+        self,
+        key: StorageKey,
+        data: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Запись полей и чтение результата за один round-trip."""
+        redis_key = self.key_builder.build(key, 'data')
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if data:
+                pipe.hset(
+                    redis_key,
+                    mapping={field: dumps(value)
+                             for field, value in data.items()},
+                )
+                if self.data_ttl:
+                    pipe.expire(redis_key, self.data_ttl)
+            pipe.hgetall(redis_key)
+            result = await pipe.execute()
+        return {field.decode('utf-8'): loads(value)
+                for field, value in result[-1].items()}
+
+
+def build_storage() -> BaseStorage:
+    """FSM хранилище по настройке FSM_STORAGE."""
+    if settings.FSM_STORAGE == 'redis':
+        return RedisStorage.from_url(
+            settings.get_redis_url,
+            state_ttl=settings.FSM_STATE_TTL,
+            data_ttl=settings.FSM_DATA_TTL,
+        )
+    return BoundedMemoryStorage(
+        ttl=settings.FSM_STATE_TTL,
+        max_keys=settings.FSM_MAX_KEYS,
+        max_bytes=settings.FSM_MAX_BYTES,
+    )
@@ -0,0 +1,87 @@
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+SUBSCRIPTION_FIELDS = ('id', 'type', 'protocol', 'end_date', 'is_active')
+INTERNED_FIELDS = ('type', 'protocol')
+
+
+@dataclass(slots=True)
+class CachedUser:
+    """Запись кэша: данные пользователя и время устаревания."""
+
+    expires_at: float
+    data: dict
+
+
+def compact_user(user: dict) -> dict:
+    """Оставляет только поля, которые читают хендлеры.
+
+    Повторяющиеся строки (тип, протокол, регион) интернируются,
+    чтобы записи разных пользователей ссылались на одни объекты.
+    """
+    subscriptions = []
+    for sub in user.get('subscription') or ():
+        item = {field: sub.get(field) for field in SUBSCRIPTION_FIELDS}
+        for field in INTERNED_FIELDS:
+            if isinstance(item[field], str):
+                item[field] = sys.intern(item[field])
+        region = sub.get('region') or {}
+        item['region'] = {
+            'code': sys.intern(region.get('code', '')),
+            'name': sys.intern(region.get('name', '')),
+        }
+        subscriptions.append(item)
+    return {
+        'telegram_id': user.get('telegram_id'),
+        'subscription': subscriptions or None,
+    }
+
+
+class UserCache:
+    """Кэш профилей пользователей с TTL, ключ - telegram_id."""
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._items: OrderedDict[int, CachedUser] = OrderedDict()
+
+    def get(self, tg_id: int) -> dict | None:
+        """Данные пользователя, если запись есть и не устарела."""
+        item = self._items.get(tg_id)
+        if item is None:
+            return None
+        if item.expires_at < time.monotonic():
+            del self._items[tg_id]
+            return None
+        self._items.move_to_end(tg_id)
+        return item.data
+
+    def set(self, tg_id: int, user: dict) -> dict:
+        """Сохранение профиля в компактном виде."""
+        data = compact_user(user)
+        self._items[tg_id] = CachedUser(
+            expires_at=time.monotonic() + self.ttl, data=data)
+        self._items.move_to_end(tg_id)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+        return data
+
+    def invalidate(self, tg_id: int) -> None:
+        """Сброс записи после изменения подписок или платежей."""
+        self._items.pop(tg_id, None)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+user_cache = UserCache(
+    ttl=settings.USER_CACHE_TTL,
+    max_size=settings.USER_CACHE_MAX_SIZE,
+)
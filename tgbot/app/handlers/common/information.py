@@ -4,8 +4,8 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 from aiogram.utils.chat_action import ChatActionSender
 
+from app.core.backend import backend_client
 from app.core.bot import bot
-from app.core.config import settings
 from app.forms.subscription import SupportForm
 from app.keyboards.inline import (
     device_inline_kb,
@@ -82,14 +82,10 @@ async def get_ref_url(call: CallbackQuery):
     """CallBack запрос для получения реферальной ссылки."""
     await call.answer(CommonMessage.LOAD_MSG_REF, show_alert=False)
     async with ChatActionSender.typing(bot=bot, chat_id=call.message.chat.id):
-        url = (settings.get_backend_url +
-               settings.PAYMENT_PATH +
-               str(call.from_user.id))
-        async with call.bot.http_client.get(url) as response:
-            if response.status != 200:
-                await call.message.answer('Ошибка запроса состояния бонусов')
-                return
-            answer = await response.json()
+        answer = await backend_client.get_bonus_info(call.from_user.id)
+        if answer is None:
+            await call.message.answer('Ошибка запроса состояния бонусов')
+            return
         try:
             await call.message.edit_text(
                 text=CommonMessage.REFERRAL_INFO_MESSAGE.format(
@@ -117,14 +113,10 @@ async def get_price(call: CallbackQuery):
     """CallBack запрос для получения информации по стоимости."""
     await call.answer(CommonMessage.LOAD_MSG_PRICE, show_alert=False)
     async with ChatActionSender.typing(bot=bot, chat_id=call.message.chat.id):
-        url = (settings.get_backend_url +
-                settings.SUBSCRIPTION_PATH +
-                settings.PRICE_PATH)
-        async with call.bot.http_client.get(url) as response:
-            if response.status != 200:
-                await call.message.answer('Ошибка запроса цены на ВПН')
-                return
-            answer = await response.json()
+        answer = await backend_client.get_prices()
+        if answer is None:
+            await call.message.answer('Ошибка запроса цены на ВПН')
+            return
         try:
             await call.message.edit_text(
                 text=CommonMessage.format_price_message(answer),
@@ -213,14 +205,11 @@ async def get_certificate(call: CallbackQuery, current_user: dict):
     if current_user.get('subscription'):
         async with ChatActionSender.typing(bot=bot,
                                            chat_id=call.message.chat.id):
-            url = (settings.get_backend_url +
-                   settings.SUBSCRIPTION_PATH +
-                   str(call.from_user.id))
-            async with call.bot.http_client.get(url) as response:
-                if response.status != 200:
-                    await call.message.answer('Ошибка запроса сертификатов')
-                    return
-                answer = await response.json()
+            answer = await backend_client.get_subscriptions(
+                call.from_user.id)
+            if answer is None:
+                await call.message.answer('Ошибка запроса сертификатов')
+                return
             try:
                 await call.message.edit_text(
                     CommonMessage.MSG_FOR_OVPN,
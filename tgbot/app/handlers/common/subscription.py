@@ -4,9 +4,17 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery
 from aiogram.utils.chat_action import ChatActionSender
 
+from app.core.backend import backend_client
 from app.core.bot import bot
-from app.core.config import settings
-from app.forms.subscription import SubscriptionForm, SubscriptionExtensionForm
+from app.core.catalogue import server_catalogue
+from app.core.user_cache import user_cache
+from app.keyboards.callback import (
+    PurchaseCallback,
+    PurchaseStep,
+    RenewCallback,
+    RenewStep,
+    SUB_TYPES,
+)
 from app.keyboards.inline import (
     choice_duration_kb,
     choice_location_kb,
@@ -54,25 +62,21 @@ async def pay_subscription(
             #     reply_markup=choice_sub_inline_kb())
     else:
         async with ChatActionSender.typing(bot=bot, chat_id=call.message.chat.id):
-            url = settings.get_backend_url + settings.SERVER_PATH
-            async with call.bot.http_client.get(url) as response:
-                servers = await response.json()
-            await state.update_data(servers=servers)
+            next_step = PurchaseCallback(step=PurchaseStep.duration)
             try:
                 await call.message.edit_text(
                     text=CommonMessage.CHOICE_MSG_TYPE_SUB,
-                    reply_markup=choice_type_inline_kb(trial=True),
+                    reply_markup=choice_type_inline_kb(next_step, trial=True),
                 )
             except TelegramBadRequest:
                 await call.message.answer(
                     text=CommonMessage.CHOICE_MSG_TYPE_SUB,
-                    reply_markup=choice_type_inline_kb(trial=True),
+                    reply_markup=choice_type_inline_kb(next_step, trial=True),
                 )
             # await call.message.delete()
             # await call.message.answer(
             #     CommonMessage.CHOICE_MSG_TYPE_SUB,
             #     reply_markup=choice_type_inline_kb(trial=True))
-            await state.set_state(SubscriptionForm.type)
 
 
 @router.callback_query(F.data == 'get_trial')
@@ -81,201 +85,188 @@ async def get_trial(call: CallbackQuery, state: FSMContext):
     await state.clear()
     await call.answer(CommonMessage.LOAD_MSG_TRIAL_SUB, show_alert=False)
     async with ChatActionSender.typing(bot=bot, chat_id=call.message.chat.id):
-        url = settings.get_backend_url + settings.SERVER_PATH
-        async with call.bot.http_client.get(url) as response:
-            servers = await response.json()
-        await state.update_data(servers=servers)
-        await state.update_data(type=SubscriptionType.trial)
+        servers = await server_catalogue.get_servers()
+        next_step = PurchaseCallback(
+            step=PurchaseStep.protocol,
+            type=SUB_TYPES.index(SubscriptionType.trial),
+        )
         try:
             await call.message.edit_text(
                 text=CommonMessage.CHOICE_MSG_LOCATION,
-                reply_markup=choice_location_kb(servers),
+                reply_markup=choice_location_kb(servers, next_step),
             )
         except TelegramBadRequest:
             await call.message.answer(
                 text=CommonMessage.CHOICE_MSG_LOCATION,
-                reply_markup=choice_location_kb(servers),
+                reply_markup=choice_location_kb(servers, next_step),
             )
         # await call.message.delete()
         # await call.message.answer(
         #     CommonMessage.CHOICE_MSG_LOCATION,
         #     reply_markup=choice_location_kb(servers))
-    await state.set_state(SubscriptionForm.location)
 
 
 @router.callback_query(F.data == 'update_sub')
 async def choice_subscription(
     call: CallbackQuery,
-    state: FSMContext,
     current_user: dict,
 ):
     """CallBack запрос для выбора подписки, только обновление."""
+    subscriptions = current_user.get('subscription') or []
+    reply_markup = choice_subscription_inline_kb(
+        subscriptions,
+        lambda sub: PurchaseCallback(
+            step=PurchaseStep.type, sub_id=sub.get('id')),
+    )
     async with ChatActionSender.typing(bot=bot, chat_id=call.message.chat.id):
         try:
             await call.message.edit_text(
                 text=CommonMessage.MSG_FOR_UPDATE_SUB,
-                reply_markup=choice_subscription_inline_kb(current_user.get('subscription')),
+                reply_markup=reply_markup,
             )
         except TelegramBadRequest:
             await call.message.answer(
                 text=CommonMessage.MSG_FOR_UPDATE_SUB,
-                reply_markup=choice_subscription_inline_kb(current_user.get('subscription')),
+                reply_markup=reply_markup,
             )
         # await call.message.delete()
         # await call.message.answer(
         #     CommonMessage.MSG_FOR_UPDATE_SUB,
         #     reply_markup=choice_subscription_inline_kb(current_user.get('subscription')))
-    await state.set_state(SubscriptionForm.subscription)
 
 
 @router.callback_query(F.data == 'new_sub')
-async def new_subscription(
-    call: CallbackQuery,
-    state: FSMContext,
-):
+async def new_subscription(call: CallbackQuery):
     """CallBack запрос для выбора подписки, только обновление."""
+    next_step = PurchaseCallback(step=PurchaseStep.duration)
     async with ChatActionSender.typing(bot=bot, chat_id=call.message.chat.id):
-        url = settings.get_backend_url + settings.SERVER_PATH
-        async with call.bot.http_client.get(url) as response:
-            servers = await response.json()
-        await state.update_data(servers=servers)
         try:
             await call.message.edit_text(
                 text=CommonMessage.CHOICE_MSG_TYPE_SUB,
-                reply_markup=choice_type_inline_kb(trial=False),
+                reply_markup=choice_type_inline_kb(next_step, trial=False),
             )
         except TelegramBadRequest:
             await call.message.answer(
                 text=CommonMessage.CHOICE_MSG_TYPE_SUB,
-                reply_markup=choice_type_inline_kb(trial=False),
+                reply_markup=choice_type_inline_kb(next_step, trial=False),
             )
         # await call.message.delete()
         # await call.message.answer(
         #     CommonMessage.CHOICE_MSG_TYPE_SUB,
         #     reply_markup=choice_type_inline_kb(trial=False))
-    await state.set_state(SubscriptionForm.type)
 
 
-@router.callback_query(SubscriptionForm.subscription)
-async def choice_type(call: CallbackQuery, state: FSMContext):
+@router.callback_query(PurchaseCallback.filter(F.step == PurchaseStep.type))
+async def choice_type(call: CallbackQuery, callback_data: PurchaseCallback):
     """CallBack запрос для выбора типа, только покупка/обновление."""
-    await state.update_data(subscription=call.data)
+    next_step = callback_data.model_copy(
+        update={'step': PurchaseStep.duration})
     async with ChatActionSender.typing(bot=bot, chat_id=call.message.chat.id):
-        url = settings.get_backend_url + settings.SERVER_PATH
-        async with call.bot.http_client.get(url) as response:
-            servers = await response.json()
-        await state.update_data(servers=servers)
         try:
             await call.message.edit_text(
                 text=CommonMessage.CHOICE_MSG_TYPE_SUB,
-                reply_markup=choice_type_inline_kb(trial=False),
+                reply_markup=choice_type_inline_kb(next_step, trial=False),
             )
         except TelegramBadRequest:
             await call.message.answer(
                 text=CommonMessage.CHOICE_MSG_TYPE_SUB,
-                reply_markup=choice_type_inline_kb(trial=False),
+                reply_markup=choice_type_inline_kb(next_step, trial=False),
             )
         # await call.message.delete()
         # await call.message.answer(
         #     CommonMessage.CHOICE_MSG_TYPE_SUB,
         #     reply_markup=choice_type_inline_kb(trial=False))
-    await state.set_state(SubscriptionForm.type)
 
 
-@router.callback_query(SubscriptionForm.type)
-async def choice_duration(call: CallbackQuery, state: FSMContext):
+@router.callback_query(PurchaseCallback.filter(F.step == PurchaseStep.duration))
+async def choice_duration(call: CallbackQuery, callback_data: PurchaseCallback):
     """CallBack запрос для выбора длительность, только покупка/обновление."""
-    await state.update_data(type=call.data)
+    next_step = callback_data.model_copy(
+        update={'step': PurchaseStep.location})
     async with ChatActionSender.typing(bot=bot, chat_id=call.message.chat.id):
         try:
             await call.message.edit_text(
                 text=CommonMessage.CHOICE_MSG_DURATION,
-                reply_markup=choice_duration_kb(),
+                reply_markup=choice_duration_kb(next_step),
             )
         except TelegramBadRequest:
             await call.message.answer(
                 text=CommonMessage.CHOICE_MSG_DURATION,
-                reply_markup=choice_duration_kb(),
+                reply_markup=choice_duration_kb(next_step),
             )
         # await call.message.delete()
         # await call.message.answer(
         #     CommonMessage.CHOICE_MSG_DURATION,
         #     reply_markup=choice_duration_kb())
-    await state.set_state(SubscriptionForm.duration)
 
 
-@router.callback_query(SubscriptionForm.duration)
-async def choice_location(call: CallbackQuery, state: FSMContext):
+@router.callback_query(PurchaseCallback.filter(F.step == PurchaseStep.location))
+async def choice_location(call: CallbackQuery, callback_data: PurchaseCallback):
     """CallBack запрос для выбора локации, только покупка/обновление."""
-    await state.update_data(duration=call.data)
-    data = await state.get_data()
-    servers = data.get('servers')
+    servers = await server_catalogue.get_servers()
+    next_step = callback_data.model_copy(
+        update={'step': PurchaseStep.protocol})
     async with ChatActionSender.typing(bot=bot, chat_id=call.message.chat.id):
         try:
             await call.message.edit_text(
                 text=CommonMessage.CHOICE_MSG_LOCATION,
-                reply_markup=choice_location_kb(servers),
+                reply_markup=choice_location_kb(servers, next_step),
             )
         except TelegramBadRequest:
             await call.message.answer(
                 text=CommonMessage.CHOICE_MSG_LOCATION,
-                reply_markup=choice_location_kb(servers),
+                reply_markup=choice_location_kb(servers, next_step),
             )
         # await call.message.delete()
         # await call.message.answer(
         #     CommonMessage.CHOICE_MSG_LOCATION,
         #     reply_markup=choice_location_kb(servers))
-    await state.set_state(SubscriptionForm.location)
 
 
-@router.callback_query(SubscriptionForm.location)
-async def choice_protocol(call: CallbackQuery, state: FSMContext):
+@router.callback_query(PurchaseCallback.filter(F.step == PurchaseStep.protocol))
+async def choice_protocol(call: CallbackQuery, callback_data: PurchaseCallback):
     """CallBack запрос для выбора протокола."""
-    await state.update_data(location=call.data)
-    data = await state.get_data()
-    servers = data.get('servers')
+    servers = await server_catalogue.get_servers()
+    next_step = callback_data.model_copy(
+        update={'step': PurchaseStep.confirm})
     async with ChatActionSender.typing(bot=bot, chat_id=call.message.chat.id):
         try:
             await call.message.edit_text(
                 text=CommonMessage.CHOICE_MSG_PROTOCOL,
-                reply_markup=choice_protocol_kb(servers),
+                reply_markup=choice_protocol_kb(servers, next_step),
             )
         except TelegramBadRequest:
             await call.message.answer(
                 text=CommonMessage.CHOICE_MSG_PROTOCOL,
-                reply_markup=choice_protocol_kb(servers),
+                reply_markup=choice_protocol_kb(servers, next_step),
             )
         # await call.message.delete()
         # await call.message.answer(
         #     CommonMessage.CHOICE_MSG_PROTOCOL,
         #     reply_markup=choice_protocol_kb(servers))
-    await state.set_state(SubscriptionForm.protocol)
 
 
-@router.callback_query(SubscriptionForm.protocol)
-async def create_subscription(call: CallbackQuery, state: FSMContext):
+@router.callback_query(PurchaseCallback.filter(F.step == PurchaseStep.confirm))
+async def create_subscription(
+    call: CallbackQuery,
+    callback_data: PurchaseCallback,
+):
     """Обращение к бэкенду за новой подпиской."""
-    await state.update_data(protocol=call.data)
-    data = await state.get_data()
     async with ChatActionSender.typing(bot=bot, chat_id=call.message.chat.id):
-        url = settings.get_backend_url + settings.SUBSCRIPTION_PATH
         payload = SubscriptionCreate(
             tg_id=call.from_user.id,
-            type=data['type'],
-            sub_id=data.get('subscription', None),
-            duration=data.get('duration', None),
-            region_code=data['location'],
-            protocol=data['protocol']
+            type=callback_data.sub_type,
+            sub_id=callback_data.sub_id,
+            duration=callback_data.sub_duration,
+            region_code=callback_data.region,
+            protocol=callback_data.vpn_protocol,
         )
-        async with call.bot.http_client.post(
-            url, json=payload.model_dump(mode='json')
-        ) as response:
-
-            if response.status not in (200, 201):
-                await call.message.answer('Ошибка оформления подписки')
-                return
-            answer = await response.json()
-    if data.get('type') == SubscriptionType.trial:
+        answer = await backend_client.create_subscription(payload)
+        if answer is None:
+            await call.message.answer('Ошибка оформления подписки')
+            return
+    if callback_data.sub_type == SubscriptionType.trial:
+        user_cache.invalidate(call.from_user.id)
         lines = []
         region = answer.get('region').get('name', '❓Регион неизвестен')
         end_date = answer.get('end_date', '')[:10]
@@ -316,13 +307,11 @@ async def create_subscription(call: CallbackQuery, state: FSMContext):
         # await call.message.answer(
         #     CommonMessage.URL_FOR_PAY.format(**answer),
         #     reply_markup=payment_kb(answer.get('url')))
-    await state.clear()
 
 
 @router.callback_query(F.data == 'renew_sub')
 async def renew_sub(
     call: CallbackQuery,
-    state: FSMContext,
     current_user: dict,
 ):
     """CallBack запрос для выбора подписки, только продление."""
@@ -330,121 +319,92 @@ async def renew_sub(
         subscription = current_user.get('subscription')
         if not subscription:
             await call.message.answer("У тебя нет активных подписок для продления.")
+            return
+        # Пробную подписку нельзя продлить без выбора нового типа.
+        reply_markup = choice_subscription_inline_kb(
+            subscription,
+            lambda sub: RenewCallback(
+                step=(RenewStep.type
+                      if sub.get('type') == SubscriptionType.trial
+                      else RenewStep.duration),
+                sub_id=sub.get('id'),
+            ),
+        )
         try:
             await call.message.edit_text(
                 text=CommonMessage.MSG_FOR_RENEW_SUB,
-                reply_markup=choice_subscription_inline_kb(subscription),
+                reply_markup=reply_markup,
             )
         except TelegramBadRequest:
             await call.message.answer(
                 text=CommonMessage.MSG_FOR_RENEW_SUB,
-                reply_markup=choice_subscription_inline_kb(subscription),
+                reply_markup=reply_markup,
             )
         # await call.message.delete()
         # await call.message.answer(
         #     CommonMessage.MSG_FOR_RENEW_SUB,
         #     reply_markup=choice_subscription_inline_kb(subscription))
-        if (len(subscription) == 1 and
-            subscription[-1].get('type') == SubscriptionType.trial):
-            await state.set_state(SubscriptionExtensionForm.type)
-        else:
-            await state.set_state(SubscriptionExtensionForm.sub_id)
 
 
-@router.callback_query(SubscriptionExtensionForm.type)
-async def type_renew_sub(call: CallbackQuery, state: FSMContext):
+@router.callback_query(RenewCallback.filter(F.step == RenewStep.type))
+async def type_renew_sub(call: CallbackQuery, callback_data: RenewCallback):
     """CallBack запрос для выбора типа подписки, только продление."""
-    await state.update_data(sub_id=call.data)
+    next_step = callback_data.model_copy(update={'step': RenewStep.duration})
     async with ChatActionSender.typing(bot=bot, chat_id=call.message.chat.id):
         try:
             await call.message.edit_text(
                 text=CommonMessage.CHOICE_MSG_TYPE_SUB,
-                reply_markup=choice_type_inline_kb(),
+                reply_markup=choice_type_inline_kb(next_step),
             )
         except TelegramBadRequest:
             await call.message.answer(
                 text=CommonMessage.CHOICE_MSG_TYPE_SUB,
-                reply_markup=choice_type_inline_kb(),
+                reply_markup=choice_type_inline_kb(next_step),
             )
         # await call.message.delete()
         # await call.message.answer(
         #     CommonMessage.CHOICE_MSG_TYPE_SUB,
         #     reply_markup=choice_type_inline_kb())
-    await state.set_state(SubscriptionExtensionForm.sub_id)
 
 
-@router.callback_query(SubscriptionExtensionForm.sub_id)
-async def extension_sub(
-    call: CallbackQuery,
-    state: FSMContext,
-    current_user: dict,
-):
+@router.callback_query(RenewCallback.filter(F.step == RenewStep.duration))
+async def extension_sub(call: CallbackQuery, callback_data: RenewCallback):
     """CallBack запрос для выбора длительности, только продление."""
+    next_step = callback_data.model_copy(update={'step': RenewStep.confirm})
     async with ChatActionSender.typing(bot=bot, chat_id=call.message.chat.id):
-        subs = current_user.get('subscription')
-        sub_check = next(
-            (sub for sub in subs if str(sub.get('id')) == call.data), None
-        )
-        data = await state.get_data()
-        if data.get('sub_id'):
-            await state.update_data(type=call.data)
-        elif (data.get('type') is None and
-              (sub_check and sub_check.get('type') == 'Пробная')):
-            await state.update_data(sub_id=call.data)
-            try:
-                await call.message.edit_text(
-                    text=CommonMessage.CHOICE_MSG_TYPE_SUB,
-                    reply_markup=choice_type_inline_kb(),
-                )
-            except TelegramBadRequest:
-                await call.message.answer(
-                    text=CommonMessage.CHOICE_MSG_TYPE_SUB,
-                    reply_markup=choice_type_inline_kb(),
-                )
-            # await call.message.delete()
-            # await call.message.answer(
-            #     CommonMessage.CHOICE_MSG_TYPE_SUB,
-            #     reply_markup=choice_type_inline_kb())
-            # return await state.set_state(SubscriptionExtensionForm.sub_id)
-        else:
-            await state.update_data(sub_id=call.data)
         try:
             await call.message.edit_text(
                 text=CommonMessage.CHOICE_MSG_DURATION,
-                reply_markup=choice_duration_kb(),
+                reply_markup=choice_duration_kb(next_step),
             )
         except TelegramBadRequest:
             await call.message.answer(
                 text=CommonMessage.CHOICE_MSG_DURATION,
-                reply_markup=choice_duration_kb(),
+                reply_markup=choice_duration_kb(next_step),
             )
         # await call.message.delete()
         # await call.message.answer(
         #     CommonMessage.CHOICE_MSG_DURATION,
         #     reply_markup=choice_duration_kb())
-    await state.set_state(SubscriptionExtensionForm.extension)
 
 
-@router.callback_query(SubscriptionExtensionForm.extension)
-async def extension_subscription(call: CallbackQuery, state: FSMContext):
+@router.callback_query(RenewCallback.filter(F.step == RenewStep.confirm))
+async def extension_subscription(
+    call: CallbackQuery,
+    callback_data: RenewCallback,
+):
     """Обращение к бэкенду для продления существующей подписки."""
-    await state.update_data(extension=call.data)
-    data = await state.get_data()
     async with ChatActionSender.typing(bot=bot, chat_id=call.message.chat.id):
-        url = f'{settings.get_backend_url}{settings.SUBSCRIPTION_PATH}'
         payload = SubscriptionRenew(
             tg_id=call.from_user.id,
-            sub_id=data.get('sub_id'),
-            duration=data.get('extension'),
-            type=data.get('type')
+            sub_id=callback_data.sub_id,
+            duration=callback_data.sub_duration,
+            type=callback_data.sub_type,
         )
-        async with call.bot.http_client.patch(
-            url, json=payload.model_dump(mode='json')
-        ) as response:
-            if response.status not in (200, 201):
-                await call.message.answer('Ошибка оформления подписки')
-                return
-            answer = await response.json()
+        answer = await backend_client.renew_subscription(payload)
+        if answer is None:
+            await call.message.answer('Ошибка оформления подписки')
+            return
         try:
             await call.message.edit_text(
                 text=CommonMessage.URL_FOR_PAY_RENEW.format(**answer),
@@ -459,4 +419,3 @@ async def extension_subscription(call: CallbackQuery, state: FSMContext):
         # await call.message.answer(
         #     CommonMessage.URL_FOR_PAY_RENEW.format(**answer),
         #     reply_markup=payment_kb(answer.get('url')))
-    await state.clear()
@@ -0,0 +1,68 @@
+import enum
+
+from aiogram.filters.callback_data import CallbackData
+
+from app.schemas.subscription import (
+    SubscriptionDuration,
+    SubscriptionType,
+    VPNProtocol,
+)
+
+# В callback_data передаются индексы значений, а не сами значения:
+# кириллические названия не помещаются в лимит Telegram в 64 байта.
+# Новые значения добавлять только в конец перечислений.
+SUB_TYPES = tuple(SubscriptionType)
+DURATIONS = tuple(SubscriptionDuration)
+PROTOCOLS = tuple(VPNProtocol)
+
+
+class PurchaseStep(str, enum.Enum):
+    type = 't'
+    duration = 'd'
+    location = 'l'
+    protocol = 'p'
+    confirm = 'c'
+
+
+class RenewStep(str, enum.Enum):
+    type = 't'
+    duration = 'd'
+    confirm = 'c'
+
+
+class SubscriptionChoice(CallbackData, prefix='_'):
+    """Общие поля выбора подписки и их преобразование в значения."""
+
+    type: int | None = None
+    duration: int | None = None
+    sub_id: int | None = None
+
+    @property
+    def sub_type(self) -> SubscriptionType | None:
+        return None if self.type is None else SUB_TYPES[self.type]
+
+    @property
+    def sub_duration(self) -> SubscriptionDuration | None:
+        return None if self.duration is None else DURATIONS[self.duration]
+
+
+class PurchaseCallback(SubscriptionChoice, prefix='buy'):
+    """Шаг оформления или изменения подписки.
+
+    Кнопка несет все выбранные ранее параметры, поэтому шаги
+    не обращаются к FSM хранилищу.
+    """
+
+    step: PurchaseStep
+    region: str | None = None
+    protocol: int | None = None
+
+    @property
+    def vpn_protocol(self) -> VPNProtocol | None:
+        return None if self.protocol is None else PROTOCOLS[self.protocol]
+
+
+class RenewCallback(SubscriptionChoice, prefix='renew'):
+    """Шаг продления подписки."""
+
+    step: RenewStep
@@ -1,12 +1,24 @@
-from typing import Any
+from typing import Callable, Iterable
 
+from aiogram.filters.callback_data import CallbackData
 from aiogram.types import (
     InlineKeyboardButton,
     InlineKeyboardMarkup,
 )
 
+from app.keyboards.callback import (
+    DURATIONS,
+    PROTOCOLS,
+    SUB_TYPES,
+    PurchaseCallback,
+    RenewCallback,
+)
 from app.messages.common import CommonMessage, Keyboards
-from app.schemas.subscription import SubscriptionDuration, SubscriptionType
+from app.schemas.subscription import (
+    SubscriptionDuration,
+    SubscriptionType,
+    VPNProtocol,
+)
 
 
 def main_inline_kb() -> InlineKeyboardMarkup:
@@ -46,7 +58,10 @@ def subscription_inline_kb(trial: bool = False) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=inline_kb_list)
 
 
-def choice_subscription_inline_kb(subscriptions: dict) -> InlineKeyboardMarkup:
+def choice_subscription_inline_kb(
+    subscriptions: list[dict],
+    callback_for: Callable[[dict], CallbackData],
+) -> InlineKeyboardMarkup:
     """Инлайн клавиатура с выбором подписки."""
     inline_kb_list = [
         [
@@ -55,7 +70,7 @@ def choice_subscription_inline_kb(subscriptions: dict) -> InlineKeyboardMarkup:
                       f'{sub.get('protocol')} '
                       f'до {sub.get('end_date')[:10]} '
                       f'на {sub.get('type')} '),
-                callback_data=f'{sub.get('id')}')
+                callback_data=callback_for(sub).pack())
         ] for sub in subscriptions
     ]
     inline_kb_list.append(
@@ -64,13 +79,20 @@ def choice_subscription_inline_kb(subscriptions: dict) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=inline_kb_list)
 
 
-def choice_type_inline_kb(trial: bool = False) -> InlineKeyboardMarkup:
+def choice_type_inline_kb(
+    next_step: PurchaseCallback | RenewCallback,
+    trial: bool = False,
+) -> InlineKeyboardMarkup:
     """Инлайн клавиатура с выбором типа подписки."""
     inline_kb_list = [
-        [InlineKeyboardButton(text=Keyboards.TWO_DEVICE,
-                              callback_data=SubscriptionType.devices_2)],
-        [InlineKeyboardButton(text=Keyboards.FOUR_DEVICE,
-                              callback_data=SubscriptionType.devices_4)],
+        [InlineKeyboardButton(
+            text=text,
+            callback_data=next_step.model_copy(
+                update={'type': SUB_TYPES.index(sub_type)}).pack())]
+        for sub_type, text in (
+            (SubscriptionType.devices_2, Keyboards.TWO_DEVICE),
+            (SubscriptionType.devices_4, Keyboards.FOUR_DEVICE),
+        )
     ]
     if trial:
         inline_kb_list.append(
@@ -82,23 +104,31 @@ def choice_type_inline_kb(trial: bool = False) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=inline_kb_list)
 
 
-def choice_duration_kb() -> InlineKeyboardMarkup:
+def choice_duration_kb(
+    next_step: PurchaseCallback | RenewCallback,
+) -> InlineKeyboardMarkup:
     """Инлайн клавиатура с выбором длительности подписки."""
     inline_kb_list = [
-        [InlineKeyboardButton(text=Keyboards.ONE_MONTH,
-                              callback_data=SubscriptionDuration.month_1)],
-        [InlineKeyboardButton(text=Keyboards.SIX_MONTH,
-                              callback_data=SubscriptionDuration.month_6)],
-        [InlineKeyboardButton(text=Keyboards.TWELVE_MONTH,
-                              callback_data=SubscriptionDuration.year_1)],
-        [InlineKeyboardButton(text=Keyboards.RETURN,
-                              callback_data=Keyboards.RETURN_CALLBACK)]
+        [InlineKeyboardButton(
+            text=text,
+            callback_data=next_step.model_copy(
+                update={'duration': DURATIONS.index(duration)}).pack())]
+        for duration, text in (
+            (SubscriptionDuration.month_1, Keyboards.ONE_MONTH),
+            (SubscriptionDuration.month_6, Keyboards.SIX_MONTH),
+            (SubscriptionDuration.year_1, Keyboards.TWELVE_MONTH),
+        )
     ]
+    inline_kb_list.append(
+        [InlineKeyboardButton(text=Keyboards.RETURN,
+                              callback_data=Keyboards.RETURN_CALLBACK)])
     return InlineKeyboardMarkup(inline_keyboard=inline_kb_list)
 
 
-def choice_location_kb(servers: Any | dict,
-                       ) -> InlineKeyboardMarkup:
+def choice_location_kb(
+    servers: Iterable[dict],
+    next_step: PurchaseCallback,
+) -> InlineKeyboardMarkup:
     """Инлайн клавиатура с выбором региона сервера."""
     region_codes = {
         s.get('region').get('code'): s.get('region').get('name')
@@ -106,7 +136,9 @@ def choice_location_kb(servers: Any | dict,
     inline_kb_list = [
         [
             InlineKeyboardButton(
-                text=f'{name}', callback_data=f'{code}')
+                text=f'{name}',
+                callback_data=next_step.model_copy(
+                    update={'region': code}).pack())
         ] for code, name in region_codes.items()
     ]
     inline_kb_list.append(
@@ -116,14 +148,20 @@ def choice_location_kb(servers: Any | dict,
 
 
 def choice_protocol_kb(
-    servers: Any | dict,
+    servers: Iterable[dict],
+    next_step: PurchaseCallback,
 ) -> InlineKeyboardMarkup:
-    """Инлайн клавиатура с выбором региона сервера."""
-    protocols = {s.get('protocol') for s in servers}
+    """Инлайн клавиатура с выбором протокола в выбранном регионе."""
+    protocols = {
+        s.get('protocol') for s in servers
+        if s.get('region').get('code') == next_step.region}
     inline_kb_list = [
         [
             InlineKeyboardButton(
-                text=f'{protocol}', callback_data=f'{protocol}')
+                text=f'{protocol}',
+                callback_data=next_step.model_copy(
+                    update={'protocol': PROTOCOLS.index(
+                        VPNProtocol(protocol))}).pack())
         ] for protocol in protocols
     ]
     inline_kb_list.append(
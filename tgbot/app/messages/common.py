@@ -208,3 +208,22 @@ class NotifyMessage:
         'так как срок действия завершился.\n'
         'Ваши сертификаты отключены и необходимо продлить или оформить новую.'
     )
+    EXPIRE_SOON_TEMPLATE = (
+        '⏲️ Ваша подписка ({type}, {region}, {protocol}) '
+        'заканчивается {when}.\n'
+        'Не забудь продлить её, чтобы избежать отключения.'
+    )
+    EXPIRE_TODAY = 'сегодня'
+    EXPIRE_TOMORROW = 'завтра'
+    EXPIRE_IN_DAYS = 'через {days} {unit}'
+    DAYS_UNITS = ('день', 'дня', 'дней')
+    DIGEST_ITEM = '• {type}, {region}, {protocol}'
+    DIGEST_EXPIRING_ITEM = '• {type}, {region}, {protocol} - {when}'
+    DIGEST_EXPIRING = (
+        '⏲️ Скоро заканчиваются подписки:\n{items}\n'
+        'Не забудь продлить их, чтобы избежать отключения.'
+    )
+    DIGEST_EXPIRED = (
+        '😪 Срок действия подписок завершился, они отключены:\n{items}\n'
+        'Сертификаты отключены, необходимо продлить или оформить новые.'
+    )
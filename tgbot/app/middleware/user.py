@@ -1,30 +1,29 @@
 from typing import Awaitable, Callable, Dict, Any
 
-import aiohttp
 from aiogram import BaseMiddleware
 from aiogram.types import Message
 
-from app.core.config import settings
+from app.core.backend import backend_client
+from app.core.user_cache import user_cache
 from app.schemas.user import UserBase
 
 
 class UserMiddleware(BaseMiddleware):
 
-    async def fetch_user_data(self, event):
-        refer_from = None
+    @staticmethod
+    def get_refer_from(event: Any) -> int | None:
+        """id пригласившего из команды /start, если он передан."""
         if (isinstance(event, Message) and
             event.text and event.text.startswith("/start")):
             arg_ref = event.text.strip().split(maxsplit=1)
-            refer_from = int(arg_ref[1]) if (len(arg_ref) > 1 and
-                                             arg_ref[1].isdigit()) else None
+            return int(arg_ref[1]) if (len(arg_ref) > 1 and
+                                       arg_ref[1].isdigit()) else None
+        return None
+
+    async def fetch_user_data(self, event, refer_from: int | None = None):
         payload = UserBase(telegram_id=event.from_user.id,
                            refer_from_id=refer_from)
-        url = settings.get_backend_url + settings.AUTH_PATH
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload.model_dump()) as resp:
-                if resp.status != 201:
-                    return {}
-                return await resp.json()
+        return await backend_client.auth(payload) or {}
 
     async def __call__(
         self,
@@ -32,6 +31,12 @@ class UserMiddleware(BaseMiddleware):
         event: Any,
         data: Dict[str, Any]
     ) -> Any:
-        user_data = await self.fetch_user_data(event)
+        tg_id = event.from_user.id
+        refer_from = self.get_refer_from(event)
+        user_data = None if refer_from else user_cache.get(tg_id)
+        if user_data is None:
+            user_data = await self.fetch_user_data(event, refer_from)
+            if user_data:
+                user_data = user_cache.set(tg_id, user_data)
         data['current_user'] = user_data
         return await handler(event, data)
@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+
+
+class ServerChangedEvent(BaseModel):
+    """Событие backend об изменении активности или загрузки сервера."""
+
+    server_id: int | None = Field(default=None, description='id сервера')
@@ -27,7 +27,28 @@ class SubscriptionNotifyDB(BaseModel):
         description='Тип подписки: количество устройств')
     region: str = Field(description='Регион подписки')
     protocol: VPNProtocol = Field(description='Протокол подписки')
+    telegram_id: int | None = Field(
+        default=None,
+        description='Телеграм id клиента',
+    )
+    days_left: int | None = Field(
+        default=None,
+        description='Дней до окончания подписки',
+    )
+
+
+class SubscriptionNotifyDigest(BaseModel):
+    """Уведомления пользователя за один запуск рассылки."""
+
     telegram_id: int = Field(description='Телеграм id клиента')
+    expired: list[SubscriptionNotifyDB] = Field(
+        default_factory=list,
+        description='Отключенные подписки',
+    )
+    expiring: list[SubscriptionNotifyDB] = Field(
+        default_factory=list,
+        description='Подписки, которые скоро заканчиваются',
+    )
 
 
 class SubscriptionCreate(BaseModel):
@@ -13,3 +13,9 @@ class UserDB(UserBase):
     """Схема выдачи данных о пользователе."""
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class UserChangedEvent(BaseModel):
+    """Событие backend об изменении подписок или платежей."""
+
+    telegram_id: int = Field(description='telegram_id пользователя')
@@ -1,23 +1,28 @@
-import asyncio
-
-from aiohttp import ClientSession, web
+from aiohttp import web
 from aiogram.webhook.aiohttp_server import (
     SimpleRequestHandler,
     setup_application
 )
 
+from app.core.backend import backend_client
 from app.core.bot import bot, set_commands
+from app.core.catalogue import server_catalogue
+from app.brokers import events # noqa
 from app.brokers.notification import broker
 from app.core.config import settings
 from app.core.dispatcher import dp
 from app.core.logger import logger # noqa
+from app.core.metrics import metrics_handler
+from app.core.sender import message_sender
 
 
 async def on_startup() -> None:
     """Действия при запуске бота."""
     await set_commands()
+    await message_sender.start()
     await broker.start()
-    bot.http_client = ClientSession()
+    await backend_client.start()
+    await server_catalogue.start()
     await bot.set_webhook(settings.get_webhook_url,
                           secret_token=settings.WEBHOOK_SECRET)
 
@@ -25,8 +30,11 @@ async def on_startup() -> None:
 async def on_shutdown() -> None:
     """Действия при остановке бота."""
     await broker.stop()
-    await bot.delete_webhook(drop_pending_updates=True)
-    await bot.http_client.close()
+    await message_sender.stop(timeout=settings.SENDER_DRAIN_TIMEOUT)
+    if settings.WEBHOOK_DELETE_ON_SHUTDOWN:
+        await bot.delete_webhook(drop_pending_updates=True)
+    await server_catalogue.stop()
+    await backend_client.close()
     await bot.session.close()
 
 
@@ -42,6 +50,7 @@ def main():
         secret_token=settings.WEBHOOK_SECRET,
     )
     webhook_requests_handler.register(app, path=settings.WEBHOOK_PATH)
+    app.router.add_get(settings.METRICS_PATH, metrics_handler)
     setup_application(app, dp, bot=bot)
     web.run_app(app, host=settings.TG_HOST, port=settings.TG_PORT)
 
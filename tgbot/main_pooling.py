@@ -1,8 +1,11 @@
 import asyncio
 
-from aiohttp import ClientSession
-
+from app.core.backend import backend_client
 from app.core.bot import bot
+from app.core.catalogue import server_catalogue
+from app.core.config import settings
+from app.core.sender import message_sender
+from app.brokers import events # noqa
 from app.brokers.notification import broker
 from app.core.dispatcher import dp
 from app.core.logger import logger # noqa
@@ -12,14 +15,18 @@ async def main():
     """Запуск приложения с ботом."""
     try:
         await bot.delete_webhook(drop_pending_updates=True)
-        bot.http_client = ClientSession()
+        await backend_client.start()
+        await server_catalogue.start()
+        await message_sender.start()
         await broker.start()
         await dp.start_polling(
             bot, allowed_updates=dp.resolve_used_update_types())
     finally:
         await broker.stop()
+        await message_sender.stop(timeout=settings.SENDER_DRAIN_TIMEOUT)
+        await server_catalogue.stop()
         await bot.session.close()
-        await bot.http_client.close()
+        await backend_client.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,14 @@
+"""Общие настройки тестов бота."""
+import os
+
+# Настройки бота обязательны при импорте модулей приложения
+for name, value in {
+    'TOKEN_TG': '123456:TESTTOKENTESTTOKENTESTTOKENTESTTOKEN',
+    'ADMINS': '1', 'DOMAIN_NAME': 'localhost', 'TG_HOST': 'localhost',
+    'TG_PORT': '8080', 'WEBHOOK_SECRET': 'test',
+    'BACKEND_HOST': 'localhost', 'BACKEND_PORT': '8000',
+    'RABBITMQ_DEFAULT_USER': 'test', 'RABBITMQ_DEFAULT_PASS': 'test',
+    'RABBIT_HOST': 'localhost', 'RABBIT_PORT_WEB': '15672',
+    'RABBIT_PORT_AMQP': '5672',
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,38 @@
+"""Обработчики уведомлений о подписках."""
+import pytest
+
+from app.brokers import notification
+from app.schemas.subscription import SubscriptionNotifyDB
+
+
+class FakeSender:
+
+    def __init__(self):
+        self.sent = []
+
+    async def enqueue(self, chat_id, text, reply_markup=None):
+        self.sent.append(chat_id)
+
+
+@pytest.fixture
+def sender(monkeypatch):
+    sender = FakeSender()
+    monkeypatch.setattr(notification, 'message_sender', sender)
+    return sender
+
+
+def notify(telegram_id=None):
+    return SubscriptionNotifyDB(
+        type='2 устройства', region='Нидерланды', protocol='OpenVPN',
+        telegram_id=telegram_id, days_left=1)
+
+
+@pytest.mark.parametrize('handler', [
+    notification.send_notify_deactivate_sub,
+    notification.send_notify_end_sub,
+])
+async def test_single_notify(sender, handler):
+    await handler(notify(telegram_id=42))
+    await handler(notify())
+
+    assert sender.sent == [42]
@@ -0,0 +1,74 @@
+"""FSM хранилище в Redis на fakeredis."""
+import asyncio
+
+import pytest
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+from fakeredis.aioredis import FakeRedis
+
+from app.core.storage import RedisStorage
+
+KEY = StorageKey(bot_id=1, chat_id=10, user_id=10)
+OTHER_KEY = StorageKey(bot_id=1, chat_id=20, user_id=20)
+
+
+class Buy(StatesGroup):
+    region = State()
+
+
+@pytest.fixture
+async def storage():
+    storage = RedisStorage(FakeRedis(), state_ttl=60, data_ttl=60)
+    yield storage
+    await storage.close()
+
+
+async def test_state(storage):
+    assert await storage.get_state(KEY) is None
+
+    await storage.set_state(KEY, Buy.region)
+    assert await storage.get_state(KEY) == Buy.region.state
+    assert await storage.get_state(OTHER_KEY) is None
+
+    await storage.set_state(KEY, None)
+    assert await storage.get_state(KEY) is None
+
+
+async def test_data(storage):
+    assert await storage.get_data(KEY) == {}
+
+    await storage.set_data(KEY, {'region': 'nl', 'devices': 2})
+    assert await storage.get_data(KEY) == {'region': 'nl', 'devices': 2}
+    assert await storage.get_value(KEY, 'devices') == 2
+    assert await storage.get_value(KEY, 'missing', 'default') == 'default'
+
+    await storage.set_data(KEY, {'region': 'de'})
+    assert await storage.get_data(KEY) == {'region': 'de'}
+
+    await storage.set_data(KEY, {})
+    assert await storage.get_data(KEY) == {}
+
+
+async def test_update_data(storage):
+    await storage.set_data(KEY, {'region': 'nl'})
+
+    result = await storage.update_data(
+        KEY, {'devices': 4, 'options': {'trial': False}})
+
+    expected = {'region': 'nl', 'devices': 4, 'options': {'trial': False}}
+    assert result == expected
+    assert await storage.get_data(KEY) == expected
+    assert await storage.update_data(KEY, {}) == expected
+
+
+async def test_ttl_expiry():
+    storage = RedisStorage(FakeRedis(), state_ttl=1, data_ttl=1)
+    await storage.set_state(KEY, Buy.region)
+    await storage.update_data(KEY, {'region': 'nl'})
+    assert await storage.redis.ttl(storage.key_builder.build(KEY, 'data')) > 0
+
+    await asyncio.sleep(1.1)
+
+    assert await storage.get_state(KEY) is None
+    assert await storage.get_data(KEY) == {}
+    await storage.close()